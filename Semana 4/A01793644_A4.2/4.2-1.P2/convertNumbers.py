@@ -1,10 +1,66 @@
 """
 This module contains functions for processing data using sys, time.
 """
+import argparse
+import csv
+import os
+import struct
 import sys
 import time
-
-def process_file(file_path):
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import accumulate, islice
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the scalar path is always available
+    np = None
+
+try:
+    from instrumentation import PhaseTimer, add_phase_arguments
+    from number_parsing import ParseErrors, read_numbers, iter_numbers as iter_parsed_numbers
+except ModuleNotFoundError:
+    # Run from its own folder: the shared modules live at the root of the repository
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+    from instrumentation import PhaseTimer, add_phase_arguments
+    from number_parsing import ParseErrors, read_numbers, iter_numbers as iter_parsed_numbers
+
+# Below this many numbers the NumPy setup costs more than the scalar loop
+VECTORIZE_THRESHOLD = 64
+# Negative binaries are padded with '1' up to this many characters
+NEGATIVE_BINARY_WIDTH = 10
+# Numbers converted and written together by the streaming pipeline
+STREAM_CHUNK_SIZE = 4096
+# Output buffer of the streaming pipeline, in bytes
+WRITE_BUFFER_SIZE = 1 << 20
+# Number, binary and hexadecimal widths that fit any int64 value
+FIXED_COLUMN_WIDTHS = (20, 64, 8)
+# Distinct values kept by a ConversionCache unless another size is requested
+DEFAULT_CACHE_SIZE = 65536
+# Column names of the machine-readable outputs
+ROW_HEADERS = ('number', 'binary', 'hexadecimal')
+# File extension of every output format
+OUTPUT_EXTENSIONS = {'txt': '.txt', 'csv': '.csv', 'jsonl': '.jsonl', 'columnar': '.cnv'}
+# First bytes of a columnar conversion file
+COLUMNAR_MAGIC = b'CNVCOL1\n'
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
+
+DIGIT_ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+# Digits emitted per digit_table lookup, keeping every table at a few thousand entries
+TABLE_DIGITS = {base: max(1, 12 // base.bit_length()) for base in range(2, 37)}
+# Output format name -> (radix, two's-complement word size or None for sign and magnitude)
+OUTPUT_FORMATS = {
+    'oct': (8, None),
+    'b32': (32, None),
+    'b36': (36, None),
+    **{f'bin{bits}': (2, bits) for bits in (8, 16, 32, 64)},
+    **{f'hex{bits}': (16, bits) for bits in (8, 16, 32, 64)},
+}
+
+
+def process_file(file_path, options=None, timer=None):
     """
     Read and process a file containing numeric data.
 
@@ -14,6 +70,15 @@ def process_file(file_path):
 
     Args:
         file_path (str): The path to the input text file containing numeric data.
+        options (argparse.Namespace, optional): The options returned by 'parse_args'; by
+            default those of a plain 'convertNumbers.py file_path' run. Without --in-memory
+            the file goes through the bounded-memory 'stream_converted_numbers' pipeline,
+            which also applies --fixed-width and --formats; with it every number is loaded
+            into memory first, as the original implementation did (see
+            'convert_in_memory'). --cache-size and --output apply to both.
+        timer (PhaseTimer, optional): Times the read, parse, compute and write phases (the
+            fused phases of the streaming pipeline) and reports them after the results; they
+            are only appended to the txt results file.
 
     Returns:
         None
@@ -38,24 +103,16 @@ def process_file(file_path):
           and 'save_converted_numbers' functions to perform conversions and output handling.
     """
     start_time = time.time()
-    numbers = []
+    options = options or parse_args([file_path])
+    timer = timer or PhaseTimer(enabled=False)
+    file_name = 'ConversionResults' + OUTPUT_EXTENSIONS[options.output]
 
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            for line_number, item in enumerate(file, start=1):
-                try:
-                    number = int(item.strip())
-                    numbers.append(number)
-                except ValueError:
-                    print(f"Invalid data on line {line_number}: \
-                          '{item.strip()}' is not a valid number. Skipping...")
-
-        if not numbers:
-            raise ValueError("No valid numeric data found in the file.")
-        numbers_h_b = numbers_to_binary_and_hexa(numbers)
-        elapsed_time = time.time() - start_time  # Compute elapsed time
-        print_converted_numbers(numbers_h_b, elapsed_time)
-        save_converted_numbers(numbers_h_b, 'ConversionResults.txt', elapsed_time)
+        if options.in_memory:
+            convert_in_memory(file_path, file_name, start_time, options, timer)
+        else:
+            stream_converted_numbers(file_path, file_name, start_time, options, timer)
+        timer.report(file_name if options.output == 'txt' else None)
 
     except FileNotFoundError:
         print(f"File not found: {file_path}")
@@ -63,7 +120,478 @@ def process_file(file_path):
         print(f"An I/O error occurred while reading the file: {ioe}")
 
 
+def convert_in_memory(file_path, file_name, start_time, options, timer):
+    """
+    Load every number of a file, convert them in one batch and save the results.
+
+    Args:
+        file_path (str): The path to the input text file containing numeric data.
+        file_name (str): The name of the file where the results will be saved.
+        start_time (float): The time.time() value at which processing started.
+        options (argparse.Namespace): The options returned by 'parse_args'; only
+            --cache-size and --output apply.
+        timer (PhaseTimer): Times the read, parse, compute and write phases.
+
+    Raises:
+        ValueError: If no valid numeric data is found in the file.
+    """
+    cache = ConversionCache(options.cache_size) if options.cache_size > 0 else None
+    errors = ParseErrors(int)
+    with open(file_path, 'r', encoding='utf-8') as file:
+        numbers = read_numbers(file, int, errors, timer=timer)
+    errors.print_report()
+
+    if not numbers:
+        raise ValueError("No valid numeric data found in the file.")
+    with timer.phase('compute'):
+        numbers_h_b = numbers_to_binary_and_hexa(numbers, cache)
+    elapsed_time = time.time() - start_time  # Compute elapsed time
+    with timer.phase('write'):
+        if options.output == 'txt':
+            print_converted_numbers(numbers_h_b, elapsed_time)
+            save_converted_numbers(numbers_h_b, file_name, elapsed_time)
+        else:
+            converted = save_converted_rows(zip(*numbers_h_b), file_name, options.output)
+            print(f"{converted} numbers saved to {file_name}")
+            print(f"elapsed time:{elapsed_time}")
+    if cache is not None:
+        print(cache.report())
+
+
+def iter_numbers(file, report_invalid=True):
+    """
+    Lazily parse integers from an open text file, one per line.
+
+    Args:
+        file (iterable of str): An open text file or any iterable of lines.
+        report_invalid (bool): Print a summary of the lines that are not integers once
+            the generator finishes, is closed early or fails.
+
+    Yields:
+        int: Each valid integer, in file order. Invalid lines are skipped.
+    """
+    errors = ParseErrors(int)
+    try:
+        yield from iter_parsed_numbers(file, int, errors)
+    finally:
+        if report_invalid:
+            errors.print_report()
+
+
+def iter_converted(numbers, chunk_size=STREAM_CHUNK_SIZE, formats=(), cache=None):
+    """
+    Lazily convert a stream of integers into (number, binary, hexadecimal) triples.
+
+    The stream is consumed in chunks of 'chunk_size' numbers so that each chunk can go
+    through the batch conversion of 'numbers_to_binary_and_hexa' while only one chunk is
+    held in memory at a time.
+
+    Args:
+        numbers (iterable of int): The integers to be converted.
+        chunk_size (int): How many numbers are converted together.
+        formats (iterable of str): Extra OUTPUT_FORMATS appended to every row.
+        cache (ConversionCache, optional): Cache shared by all the chunks.
+
+    Yields:
+        tuple: A (number, binary, hexadecimal) triple for every input number, followed by
+        one column per extra format.
+    """
+    formats = tuple(formats)
+    iterator = iter(numbers)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        if not formats:
+            yield from zip(*numbers_to_binary_and_hexa(chunk, cache))
+            continue
+        for triple in zip(*numbers_to_binary_and_hexa(chunk, cache)):
+            yield triple + tuple(convert_number(triple[0], formats))
+
+
+def format_width(number, name):
+    """
+    Return the printed width of a number in one of the OUTPUT_FORMATS.
+
+    Args:
+        number (int): The integer to be measured.
+        name (str): A key of OUTPUT_FORMATS.
+
+    Returns:
+        int: The length of convert_number(number, [name])[0].
+    """
+    base, bits = OUTPUT_FORMATS[name]
+    if bits:
+        if not -(1 << (bits - 1)) <= number < (1 << bits):
+            return len('#N/A')
+        return bits // (base.bit_length() - 1)
+    sign = 1 if number < 0 else 0
+    if base & (base - 1):
+        return sign + len(to_radix(abs(number), base))
+    bits_per_digit = base.bit_length() - 1
+    return sign + max(-(-abs(number).bit_length() // bits_per_digit), 1)
+
+
+def column_widths(number, formats=()):
+    """
+    Return the printed widths of a number and of its binary and hexadecimal forms.
+
+    The widths are derived from the bit length of the number, so no string is built
+    (except for base 36, which is not a power of two).
+
+    Args:
+        number (int): The integer to be measured.
+        formats (iterable of str): Extra OUTPUT_FORMATS to be measured.
+
+    Returns:
+        tuple: (number width, binary width, hexadecimal width), followed by one width per
+        extra format.
+    """
+    if number < 0:
+        binary_width = max((-number).bit_length(), NEGATIVE_BINARY_WIDTH)
+    else:
+        binary_width = max(number.bit_length(), 1)
+    hex_width = max(((number & 0xFFFFFFFF).bit_length() + 3) // 4, 1)
+    return (len(str(number)), binary_width, hex_width) + \
+        tuple(format_width(number, name) for name in formats)
+
+
+def scan_column_widths(file_path, formats=()):
+    """
+    Pre-scan a numeric file to find the column widths of its conversion table.
+
+    Only the widths are kept, so the scan runs in constant memory and without converting
+    any number.
+
+    Args:
+        file_path (str): The path to the input text file containing numeric data.
+        formats (iterable of str): Extra OUTPUT_FORMATS to be measured.
+
+    Returns:
+        tuple: (count of valid numbers, number width, binary width, hexadecimal width),
+        followed by one width per extra format.
+    """
+    formats = tuple(formats)
+    count = 0
+    widths = [1] * (3 + len(formats))
+    with open(file_path, 'r', encoding='utf-8') as file:
+        for number in iter_numbers(file, report_invalid=False):
+            count += 1
+            widths = [max(pair) for pair in zip(widths, column_widths(number, formats))]
+    return (count, *widths)
+
+
+def fixed_format_width(name):
+    """
+    Return a column width that fits any int64 value in one of the OUTPUT_FORMATS.
+
+    Args:
+        name (str): A key of OUTPUT_FORMATS.
+
+    Returns:
+        int: The column width.
+    """
+    return max(format_width(-(1 << 63), name), format_width((1 << 63) - 1, name))
+
+
+def stream_converted_numbers(file_path, file_name, start_time, options=None, timer=None):
+    """
+    Convert a numeric file through a parse -> convert -> write generator pipeline.
+
+    Rows are printed and written to 'file_name' chunk by chunk with buffered writes, so memory
+    use does not grow with the input and the first rows appear before the whole file is read.
+    Column widths come either from a cheap pre-scan ('scan_column_widths') or, with
+    --fixed-width, from FIXED_COLUMN_WIDTHS without touching the file beforehand.
+
+    Args:
+        file_path (str): The path to the input text file containing numeric data.
+        file_name (str): The name of the file where the results will be saved.
+        start_time (float): The time.time() value at which processing started.
+        options (argparse.Namespace, optional): The options returned by 'parse_args'.
+            --formats adds OUTPUT_FORMATS columns, e.g. ('oct', 'hex16'); --cache-size skips
+            the conversion of values already seen; --output 'csv', 'jsonl' or 'columnar'
+            hands the rows to 'save_converted_rows' instead of the aligned table (no
+            pre-scan, no console rows).
+        timer (PhaseTimer, optional): Times the 'scan' phase and, chunk by chunk, the fused
+            'read+parse+compute' and the 'write' phases. Machine-readable outputs run as a
+            single 'read+parse+compute+write' phase.
+
+    Returns:
+        int: The number of converted numbers.
+
+    Raises:
+        ValueError: If no valid numeric data is found in the file.
+    """
+    options = options or parse_args([file_path])
+    timer = timer or PhaseTimer(enabled=False)
+    formats = options.formats
+    cache = ConversionCache(options.cache_size) if options.cache_size > 0 else None
+    if options.output == 'txt':
+        columns = table_columns(file_path, formats, options.fixed_width, timer)
+    # The invalid lines are reported once the rows are out, not in the middle of the table
+    errors = ParseErrors(int)
+    with open(file_path, 'r', encoding='utf-8') as source:
+        rows = iter_converted(iter_parsed_numbers(source, int, errors), formats=formats,
+                              cache=cache)
+        if options.output == 'txt':
+            converted, elapsed_time = write_converted_table(rows, file_name, columns,
+                                                            start_time, timer)
+        else:
+            with timer.phase('read+parse+compute+write'):
+                converted = save_converted_rows(rows, file_name, options.output,
+                                                ROW_HEADERS + formats)
+            elapsed_time = None
+    errors.print_report()
+    if elapsed_time is None:
+        if not converted:
+            raise ValueError("No valid numeric data found in the file.")
+        print(f"{converted} numbers saved to {file_name}")
+        elapsed_time = time.time() - start_time
+    print(f"elapsed time:{elapsed_time}")
+    if cache is not None:
+        print(cache.report())
+    return converted
+
+
+def table_columns(file_path, formats, fixed_width, timer):
+    """
+    Return the (header, width) of every column of the streamed conversion table.
+
+    As in the in-memory table, the widths come from the values only: a pre-scan of the
+    file measures them, unless 'fixed_width' selects widths that fit any int64 value.
+
+    Raises:
+        ValueError: If the pre-scan finds no valid numeric data in the file.
+    """
+    if fixed_width:
+        widths = list(FIXED_COLUMN_WIDTHS) + [fixed_format_width(name) for name in formats]
+    else:
+        with timer.phase('scan'):
+            count, *widths = scan_column_widths(file_path, formats)
+        if not count:
+            raise ValueError("No valid numeric data found in the file.")
+    return list(zip(('Number', 'Binary', 'Hexadecimal') + tuple(formats), widths))
+
+
+def write_converted_table(rows, file_name, columns, start_time, timer):
+    """
+    Print and save conversion rows as an aligned table, one chunk at a time.
+
+    The console keeps the Number column 10 characters wide, as 'print_converted_numbers'.
+
+    Args:
+        rows (iterable of tuple): Rows from 'iter_converted'.
+        file_name (str): The name of the text file where the table will be saved.
+        columns (list of tuple): (header, width) pairs, as returned by 'table_columns'.
+        start_time (float): The time.time() value at which processing started.
+        timer (PhaseTimer): Times the fused 'read+parse+compute' and the 'write' phases.
+
+    Returns:
+        tuple: (number of rows, elapsed time written after the table).
+
+    Raises:
+        ValueError: If there are no rows.
+    """
+    headers, widths = zip(*columns)
+    row = ' '.join(f"{{:<{width}}}" for width in widths) + '\n'
+    console_row = ' '.join(f"{{:<{width}}}" for width in (10,) + widths[1:]) + '\n'
+    rows = iter(rows)
+    converted = 0
+    with open(file_name, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as target:
+        sys.stdout.write(console_row.format(*headers))
+        target.write(row.format(*headers))
+        while True:
+            with timer.phase('read+parse+compute'):
+                chunk = list(islice(rows, STREAM_CHUNK_SIZE))
+            if not chunk:
+                break
+            converted += len(chunk)
+            with timer.phase('write'):
+                sys.stdout.write(''.join(console_row.format(*values) for values in chunk))
+                target.writelines(row.format(*values) for values in chunk)
+        if not converted:
+            raise ValueError("No valid numeric data found in the file.")
+        elapsed_time = time.time() - start_time
+        target.write(f"Elapsed Time: {elapsed_time:.2f} seconds\n")
+    return converted, elapsed_time
+
+
+@lru_cache(maxsize=None)
+def digit_table(base, width):
+    """
+    Build the cached table of every 'width'-digit string in the given base.
+
+    Entry i of the table is i written in 'base' and zero-filled to 'width' digits, so a
+    conversion can emit 'width' digits with a single lookup.
+
+    Args:
+        base (int): The radix, from 2 to 36.
+        width (int): Digits per table entry.
+
+    Returns:
+        tuple of str: base ** width zero-filled digit strings.
+    """
+    if width == 1:
+        return tuple(DIGIT_ALPHABET[:base])
+    shorter = digit_table(base, width - 1)
+    return tuple(digit + rest for digit in DIGIT_ALPHABET[:base] for rest in shorter)
+
+
+@lru_cache(maxsize=None)
+def group_table(bits_per_digit):
+    """
+    Map every 'bits_per_digit'-bit binary string to its digit in base 2 ** bits_per_digit.
+
+    Args:
+        bits_per_digit (int): Bits per output digit (3 for octal, 4 for hexadecimal...).
+
+    Returns:
+        dict: Binary group -> digit.
+    """
+    return dict(zip(digit_table(2, bits_per_digit), DIGIT_ALPHABET))
+
+
+def to_radix(value, base):
+    """
+    Convert a non-negative integer to a string in any base from 2 to 36.
+
+    Digits are produced TABLE_DIGITS[base] at a time through the cached 'digit_table', with
+    shifts and masks for power-of-two bases and divmod for the others.
+
+    Args:
+        value (int): A non-negative integer.
+        base (int): The radix, from 2 to 36.
+
+    Returns:
+        str: The digits of 'value' in 'base', uppercase, without leading zeros.
+
+    Example:
+        Given input value 255 and base 16
+        Output: 'FF'
+    """
+    if value == 0:
+        return '0'
+    width = TABLE_DIGITS[base]
+    table = digit_table(base, width)
+    chunks = []
+    if base & (base - 1) == 0:
+        shift = (base.bit_length() - 1) * width
+        mask = (1 << shift) - 1
+        while value:
+            chunks.append(table[value & mask])
+            value >>= shift
+    else:
+        chunk_base = base ** width
+        while value:
+            value, remainder = divmod(value, chunk_base)
+            chunks.append(table[remainder])
+    chunks.reverse()
+    return ''.join(chunks).lstrip('0')
+
+
+def regroup_binary(binary_str, bits_per_digit):
+    """
+    Rewrite a binary string in base 2 ** bits_per_digit by grouping its bits.
+
+    Args:
+        binary_str (str): Binary digits, as returned by to_radix(value, 2).
+        bits_per_digit (int): Bits per output digit.
+
+    Returns:
+        str: The same value in base 2 ** bits_per_digit, without leading zeros.
+    """
+    if bits_per_digit == 1:
+        return binary_str
+    table = group_table(bits_per_digit)
+    padded = binary_str.zfill(-(-len(binary_str) // bits_per_digit) * bits_per_digit)
+    digits = ''.join(table[padded[i:i + bits_per_digit]]
+                     for i in range(0, len(padded), bits_per_digit))
+    return digits.lstrip('0') or '0'
+
+
+def radix_digits(value, base, binaries):
+    """
+    Return the digits of a non-negative integer, regrouping its bits for power-of-two bases.
+
+    Args:
+        value (int): The non-negative integer to be converted.
+        base (int): The radix, from 2 to 36.
+        binaries (dict): Binary digit strings already computed, keyed by value; it is filled
+            in so that every power-of-two base of the same value shares one conversion.
+
+    Returns:
+        str: The digits, without leading zeros.
+    """
+    if base & (base - 1):
+        return to_radix(value, base)
+    if value not in binaries:
+        binaries[value] = to_radix(value, 2)
+    return regroup_binary(binaries[value], base.bit_length() - 1)
+
+
+def fits_in_word(number, bits):
+    """
+    Tell whether an integer fits in a signed or unsigned 'bits'-bit word.
+    """
+    return -(1 << (bits - 1)) <= number < (1 << bits)
+
+
+def twos_complement(number, bits, base=16, binaries=None):
+    """
+    Return the fixed-width two's-complement representation of an integer.
+
+    Args:
+        number (int): The integer, which must fit in a signed or unsigned 'bits'-bit word.
+        bits (int): Word size in bits (8, 16, 32 or 64).
+        base (int): 2 or 16, the radix of the output.
+        binaries (dict, optional): Binary digit strings shared with other conversions of the
+            same number (see radix_digits).
+
+    Returns:
+        str: The word zero-filled to all of its digits, e.g. -5 on 8 bits is 'FB'.
+
+    Raises:
+        ValueError: If the number does not fit in the word.
+    """
+    if not fits_in_word(number, bits):
+        raise ValueError(f"{number} does not fit in {bits} bits")
+    digits = bits // (base.bit_length() - 1)
+    word = number & ((1 << bits) - 1)
+    return radix_digits(word, base, {} if binaries is None else binaries).zfill(digits)
+
+
+def convert_number(number, formats):
+    """
+    Convert an integer into several output formats in a single pass.
+
+    The binary digits of each distinct value needed (the magnitude, and the word of every
+    two's-complement size selected) are computed once, and every power-of-two base is then
+    obtained by regrouping those bits. Only base 36 needs its own division loop.
+
+    Args:
+        number (int): The integer to be converted.
+        formats (iterable of str): Keys of OUTPUT_FORMATS, e.g. ('oct', 'b32', 'hex16').
+
+    Returns:
+        list of str: One representation per requested format, in the same order. Values that
+        do not fit a two's-complement word are reported as '#N/A'.
 
+    Example:
+        Given input number -5 and formats ('oct', 'bin8', 'hex16')
+        Output: ['-5', '11111011', 'FFFB']
+    """
+    binaries = {}
+    results = []
+    sign = '-' if number < 0 else ''
+    for name in formats:
+        base, bits = OUTPUT_FORMATS[name]
+        if not bits:
+            results.append(sign + radix_digits(abs(number), base, binaries))
+        elif fits_in_word(number, bits):
+            results.append(twos_complement(number, bits, base, binaries))
+        else:
+            results.append('#N/A')
+    return results
 
 
 def number_to_hex(number):
@@ -91,7 +619,7 @@ def number_to_hex(number):
         - The function optionally converts the result to uppercase letters.
         - For the input value 0, the function returns '0' to avoid an empty result.
     """
-    heximal_num = f'{number & 0xFFFFFFFF:X}'
+    heximal_num = to_radix(number & 0xFFFFFFFF, 16)
     return heximal_num
 
 
@@ -122,43 +650,19 @@ def number_to_binary(number):
         - The binary representation is always returned as a string.
     """
     if number >= 0:
-        # Procesamiento directo para números positivos
-        binary_str = ''
-        if number == 0:
-            binary_str = '0'
-        while number > 0:
-            binary_str = str(number % 2) + binary_str
-            number = number // 2
-        return binary_str
-        # Procesamiento para números negativos
-    number = -number  # Convertir a positivo para trabajar con él
-    binary_str = ''
-    while number > 0:
-        binary_str = str(number % 2) + binary_str
-        number = number // 2
-
-        # Paso 2: Invertir los bits
-    inverted_binary_str = ''.join('1' if bit == '0' else '0' for bit in binary_str)
-
-        # Paso 3: Sumar 1 al resultado invertido
-        # Convertimos la cadena invertida a lista de enteros para facilitar la suma
-    binary_list = [int(bit) for bit in inverted_binary_str]
-    for i in range(len(binary_list) - 1, -1, -1):
-        if binary_list[i] == 0:
-            binary_list[i] = 1
-            break
-    else:
-            # Si todos los bits eran 1, agregamos un 1 al principio
-        binary_list.insert(0, 1)
-        # Convertir la lista de vuelta a cadena
-    final_binary_str = ''.join(str(bit) for bit in binary_list)
-        # Asegurarse de que la cadena tenga al menos la longitud necesaria para
-        # coincidir con el ejemplo
-    if len(final_binary_str) < 10:
-        final_binary_str = '1' * (10 - len(final_binary_str)) + final_binary_str
-    return final_binary_str
-
-def numbers_to_binary_and_hexa(numbers):
+        return to_radix(number, 2)
+    # Invert the bits of the magnitude on its own length and set the lowest zero bit
+    magnitude = -number
+    length = magnitude.bit_length()
+    inverted = ((1 << length) - 1) ^ magnitude
+    binary_str = to_radix(inverted | (magnitude & -magnitude), 2).zfill(length)
+    # Pad with ones up to the width of the original examples
+    if len(binary_str) < NEGATIVE_BINARY_WIDTH:
+        binary_str = '1' * (NEGATIVE_BINARY_WIDTH - len(binary_str)) + binary_str
+    return binary_str
+
+
+def numbers_to_binary_and_hexa(numbers, cache=None):
     """
     Convert a list of integers to their binary and hexadecimal representations.
 
@@ -168,6 +672,7 @@ def numbers_to_binary_and_hexa(numbers):
 
     Args:
         numbers (list of int): A list of integers to be converted.
+        cache (ConversionCache, optional): Reuse and store conversions of repeated values.
 
     Returns:
         tuple: A tuple containing three elements:
@@ -190,6 +695,14 @@ def numbers_to_binary_and_hexa(numbers):
         - The binary representations are formatted with a '0b' prefix as Python does.
         - The hexadecimal representations are returned in uppercase.
     """
+    if cache is not None:
+        return cached_binary_and_hexa(numbers, cache)
+
+    if np is not None and len(numbers) >= VECTORIZE_THRESHOLD:
+        converted = vectorized_binary_and_hexa(numbers)
+        if converted is not None:
+            return numbers, converted[0], converted[1]
+
     bina = []
     hexa = []
     for number in numbers:
@@ -205,6 +718,205 @@ def numbers_to_binary_and_hexa(numbers):
     return numbers, bina, hexa
 
 
+class ConversionCache:
+    """
+    Bounded LRU cache of number -> (binary, hexadecimal) conversions with hit-rate counters.
+    """
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        if maxsize < 1:
+            raise ValueError("The cache size must be a positive integer.")
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, number):
+        """
+        Return the cached (binary, hexadecimal) pair of a number, or None on a miss.
+        """
+        converted = self.entries.get(number)
+        if converted is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(number)
+        self.hits += 1
+        return converted
+
+    def put(self, number, converted):
+        """
+        Store the (binary, hexadecimal) pair of a number, evicting the least recently used.
+        """
+        self.entries[number] = converted
+        self.entries.move_to_end(number)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def hit_rate(self):
+        """
+        Return the fraction of lookups served from the cache (0.0 before any lookup).
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def report(self):
+        """
+        Return a one-line summary of the cache usage.
+        """
+        return (f"Cache hits: {self.hits}, misses: {self.misses}, "
+                f"hit rate: {self.hit_rate():.2%}, size: {len(self.entries)}/{self.maxsize}")
+
+
+def cached_binary_and_hexa(numbers, cache):
+    """
+    Convert a list of integers, reusing the conversions stored in a ConversionCache.
+
+    Every distinct value missing from the cache is converted only once, all misses of the
+    batch together (so large batches still take the NumPy path), and then stored in the cache.
+
+    Args:
+        numbers (list of int): A list of integers to be converted.
+        cache (ConversionCache): The cache shared between batches.
+
+    Returns:
+        tuple: The same (numbers, binaries, hexadecimals) tuple as
+        'numbers_to_binary_and_hexa'.
+    """
+    converted = {}
+    missing = []
+    for number in numbers:
+        if number in converted:
+            cache.hits += 1
+            continue
+        pair = cache.get(number)
+        if pair is None:
+            missing.append(number)
+            converted[number] = None
+        else:
+            converted[number] = pair
+    if missing:
+        _, bina, hexa = numbers_to_binary_and_hexa(missing)
+        for number, binary, hexa_value in zip(missing, bina, hexa):
+            converted[number] = (binary, hexa_value)
+            cache.put(number, (binary, hexa_value))
+    pairs = [converted[number] for number in numbers]
+    return numbers, [pair[0] for pair in pairs], [pair[1] for pair in pairs]
+
+
+def vectorized_binary_and_hexa(numbers):
+    """
+    Convert a batch of integers to binary and hexadecimal using NumPy.
+
+    The numbers are loaded into an int64 array and every bit and nibble is extracted with
+    shifts and masks, so the digits of the whole batch are assembled as fixed-width character
+    arrays in bulk instead of one Python string at a time. The output is identical to calling
+    'number_to_binary' and 'number_to_hex' on each number.
+
+    Args:
+        numbers (list of int): A list of integers to be converted.
+
+    Returns:
+        tuple or None: A tuple with the list of binary strings and the list of hexadecimal
+        strings, or None when NumPy is not installed or a number does not fit in an int64
+        (arbitrary-precision values must go through the scalar path).
+
+    Example:
+        Given input numbers: [10, -5, 255]
+        Output:
+        (
+            ['1010', '1111111011', '11111111'],
+            ['A', 'FFFFFFFB', 'FF']
+        )
+    """
+    if np is None:
+        return None
+    try:
+        values = np.asarray(numbers, dtype=np.int64)
+    except (OverflowError, TypeError, ValueError):
+        return None
+    if values.ndim != 1 or np.any(values == np.iinfo(np.int64).min):
+        # -2**63 cannot be negated inside an int64
+        return None
+
+    one = np.uint64(1)
+    negative = values < 0
+    magnitude = np.abs(values).astype(np.uint64)
+    magnitude_length = bit_lengths(magnitude)
+
+    # Negative numbers: the magnitude's bits are inverted on its own bit length and the
+    # lowest zero bit is set (exactly what 'number_to_binary' does), then the result is
+    # left padded with ones up to NEGATIVE_BINARY_WIDTH characters
+    neg_length = magnitude_length[negative]
+    neg_magnitude = magnitude[negative]
+    neg_value = (np.left_shift(one, neg_length) - one) ^ neg_magnitude
+    neg_value |= neg_magnitude & (~neg_magnitude + one)
+    short = neg_length < NEGATIVE_BINARY_WIDTH
+    padding = np.left_shift(one, np.uint64(NEGATIVE_BINARY_WIDTH)) - \
+        np.left_shift(one, neg_length[short])
+    neg_value[short] |= padding
+
+    binary_value = magnitude.copy()
+    binary_value[negative] = neg_value
+    binary_width = np.maximum(magnitude_length, one)
+    binary_width[negative] = np.maximum(neg_length, np.uint64(NEGATIVE_BINARY_WIDTH))
+
+    hex_value = (values & 0xFFFFFFFF).astype(np.uint64)
+    hex_width = np.maximum((bit_lengths(hex_value) + np.uint64(3)) // np.uint64(4), one)
+
+    bina = digits_to_strings(binary_value, binary_width, 1)
+    hexa = digits_to_strings(hex_value, hex_width, 4)
+    return bina, hexa
+
+
+def bit_lengths(values):
+    """
+    Compute int.bit_length() for every element of a uint64 NumPy array.
+
+    Args:
+        values (numpy.ndarray): A uint64 array.
+
+    Returns:
+        numpy.ndarray: A uint64 array with the bit length of each value (0 for 0).
+    """
+    remaining = values.copy()
+    lengths = np.zeros(values.shape, dtype=np.uint64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = remaining >= np.left_shift(np.uint64(1), np.uint64(shift))
+        lengths[high] += np.uint64(shift)
+        remaining[high] >>= np.uint64(shift)
+    lengths += (remaining > 0).astype(np.uint64)
+    return lengths
+
+
+def digits_to_strings(values, widths, bits_per_digit):
+    """
+    Render uint64 values as digit strings of a power-of-two base.
+
+    Each row of a (len(values), max_width) byte matrix receives the digits of one value, most
+    significant first, and the unused cells are left as NUL bytes. Viewing every row as a
+    fixed-width byte string lets NumPy drop the trailing NULs in bulk.
+
+    Args:
+        values (numpy.ndarray): uint64 values to be rendered.
+        widths (numpy.ndarray): Number of digits to emit for each value, leading zeros included.
+        bits_per_digit (int): 1 for binary, 4 for hexadecimal.
+
+    Returns:
+        list of str: The rendered strings, in the same order as 'values'.
+    """
+    if values.size == 0:
+        return []
+    digit_chars = np.frombuffer(b"0123456789ABCDEF", dtype=np.uint8)
+    max_width = int(widths.max())
+    columns = np.arange(max_width, dtype=np.int64)
+    # Digit position, counted from the right, that lands on each cell of the matrix
+    position = widths.astype(np.int64)[:, None] - 1 - columns[None, :]
+    valid = position >= 0
+    shifts = (np.where(valid, position, 0) * bits_per_digit).astype(np.uint64)
+    digits = (values[:, None] >> shifts) & np.uint64((1 << bits_per_digit) - 1)
+    chars = np.where(valid, digit_chars[digits.astype(np.intp)], 0).astype(np.uint8)
+    rows = np.ascontiguousarray(chars).view(f"S{max_width}").ravel()
+    return rows.astype(f"U{max_width}").tolist()
+
 
 def print_converted_numbers(numbers_tuple, elapsed_time):
     """
@@ -259,7 +971,6 @@ def print_converted_numbers(numbers_tuple, elapsed_time):
     print(f"elapsed time:{elapsed_time}")
 
 
-
 def save_converted_numbers(numbers_tuple, file_name, elapsed_time):
     """
     Save converted numbers, binary, and hexadecimal representations to a text file.
@@ -309,22 +1020,232 @@ def save_converted_numbers(numbers_tuple, file_name, elapsed_time):
         max_binary_length = max(len(binary) for binary in binary_strings)
         max_hex_length = max(len(hexa) for hexa in hex_values)
 
-        file.write(f"{'Number':<{max_number_length}} {'Binary':<{max_binary_length}} \
-                   {'Hexadecimal':<{max_hex_length}}\n")
+        file.write(f"{'Number':<{max_number_length}} {'Binary':<{max_binary_length}} "
+                   f"{'Hexadecimal':<{max_hex_length}}\n")
 
         for number, binary, hexa in zip(numbers, binary_strings, hex_values):
-            file.write(f"{number:<{max_number_length}} {binary:<{max_binary_length}}\
-                        {hexa:<{max_hex_length}}\n")
+            file.write(f"{number:<{max_number_length}} {binary:<{max_binary_length}} "
+                       f"{hexa:<{max_hex_length}}\n")
 
         file.write(f"Elapsed Time: {elapsed_time:.2f} seconds\n")
 
 
+def save_converted_rows(rows, file_name, output_format, headers=ROW_HEADERS):
+    """
+    Save conversion rows in a machine-readable format with buffered bulk writes.
+
+    The rows are consumed in chunks of STREAM_CHUNK_SIZE and every chunk is written with a
+    single call, so the sink can sit at the end of the streaming pipeline.
+
+    Args:
+        rows (iterable of tuple): (number, binary, hexadecimal, ...) rows, e.g. from
+            'iter_converted'.
+        file_name (str): The name of the file where the rows will be saved.
+        output_format (str): 'csv', 'jsonl' or 'columnar' (see 'save_columnar_chunk').
+        headers (tuple of str): Column names, one per value of each row.
+
+    Returns:
+        int: The number of rows written.
+
+    Example:
+        Given rows [(10, '1010', 'A')] and output_format 'jsonl', the file contains:
+        {"number": 10, "binary": "1010", "hexadecimal": "A"}
+    """
+    rows = iter(rows)
+    written = 0
+    if output_format == 'columnar':
+        with open(file_name, 'wb', buffering=WRITE_BUFFER_SIZE) as target:
+            target.write(COLUMNAR_MAGIC + columnar_header(headers))
+            while True:
+                chunk = list(islice(rows, STREAM_CHUNK_SIZE))
+                if not chunk:
+                    break
+                target.write(columnar_row_group(chunk, len(headers)))
+                written += len(chunk)
+        return written
+
+    with open(file_name, 'w', encoding='utf-8', newline='',
+              buffering=WRITE_BUFFER_SIZE) as target:
+        if output_format == 'csv':
+            writer = csv.writer(target, lineterminator='\n')
+            writer.writerow(headers)
+            write_chunk = writer.writerows
+        elif output_format == 'jsonl':
+            # Binary, hexadecimal and the extra formats never need JSON escaping
+            template = '{' + ', '.join(
+                [f'"{headers[0]}": %d'] + [f'"{header}": "%s"' for header in headers[1:]]) + '}\n'
+
+            def write_chunk(chunk):
+                target.write(''.join(template % values for values in chunk))
+        else:
+            raise ValueError(f"Unknown output format: {output_format}")
+        while True:
+            chunk = list(islice(rows, STREAM_CHUNK_SIZE))
+            if not chunk:
+                break
+            write_chunk(chunk)
+            written += len(chunk)
+    return written
+
+
+def columnar_header(headers):
+    """
+    Encode the column names of a columnar conversion file.
+
+    Args:
+        headers (tuple of str): Column names.
+
+    Returns:
+        bytes: A little-endian uint16 column count followed by each name as a uint16 length
+        and its UTF-8 bytes.
+    """
+    parts = [struct.pack('<H', len(headers))]
+    for header in headers:
+        encoded = header.encode('utf-8')
+        parts.append(struct.pack('<H', len(encoded)) + encoded)
+    return b''.join(parts)
+
+
+def columnar_row_group(chunk, column_count):
+    """
+    Encode a chunk of rows as one row group of a columnar conversion file.
+
+    A row group is a little-endian uint32 row count followed by every column. The number
+    column is stored as a raw int64 array when every value fits (kind 0) and like the other
+    columns otherwise. String columns (kind 1) are a uint32 array of row count + 1 end offsets
+    followed by the concatenated ASCII bytes.
+
+    Args:
+        chunk (list of tuple): The rows of the group.
+        column_count (int): Values per row.
+
+    Returns:
+        bytes: The encoded row group.
+    """
+    columns = list(zip(*chunk))[:column_count]
+    parts = [struct.pack('<I', len(chunk))]
+    numbers = columns.pop(0)
+    if all(INT64_MIN <= number <= INT64_MAX for number in numbers):
+        parts.append(b'\x00' + array('q', numbers).tobytes())
+    else:
+        columns.insert(0, [str(number) for number in numbers])
+    for column in columns:
+        data = ''.join(column).encode('ascii')
+        offsets = array('I', [0])
+        offsets.extend(accumulate(len(value) for value in column))
+        parts.append(b'\x01' + offsets.tobytes() + data)
+    return b''.join(parts)
+
 
+def load_converted_columnar(file_name):
+    """
+    Load a file written by save_converted_rows(..., output_format='columnar').
+
+    Args:
+        file_name (str): The name of the columnar file.
+
+    Returns:
+        dict: Column name -> list of values; the number column holds ints.
+
+    Raises:
+        ValueError: If the file is not a columnar conversion file.
+    """
+    with open(file_name, 'rb') as source:
+        content = source.read()
+    if not content.startswith(COLUMNAR_MAGIC):
+        raise ValueError(f"{file_name} is not a columnar conversion file.")
+    view = memoryview(content)
+    position = len(COLUMNAR_MAGIC)
+    (column_count,) = struct.unpack_from('<H', view, position)
+    position += 2
+    headers = []
+    for _ in range(column_count):
+        (length,) = struct.unpack_from('<H', view, position)
+        headers.append(bytes(view[position + 2:position + 2 + length]).decode('utf-8'))
+        position += 2 + length
+    columns = {header: [] for header in headers}
+    while position < len(view):
+        (rows,) = struct.unpack_from('<I', view, position)
+        position += 4
+        for index, header in enumerate(headers):
+            kind = view[position]
+            position += 1
+            if kind == 0:
+                values = array('q')
+                values.frombytes(view[position:position + 8 * rows])
+                columns[header].extend(values)
+                position += 8 * rows
+                continue
+            offsets = array('I')
+            offsets.frombytes(view[position:position + 4 * (rows + 1)])
+            position += 4 * (rows + 1)
+            text = bytes(view[position:position + offsets[-1]]).decode('ascii')
+            position += offsets[-1]
+            values = [text[start:end] for start, end in zip(offsets, offsets[1:])]
+            columns[header].extend(map(int, values) if index == 0 else values)
+    return columns
+
+
+def parse_formats(text):
+    """
+    Split a comma separated --formats value into OUTPUT_FORMATS keys.
+
+    Raises:
+        argparse.ArgumentTypeError: If a name is not a key of OUTPUT_FORMATS.
+    """
+    names = tuple(name for name in text.split(',') if name)
+    unknown = [name for name in names if name not in OUTPUT_FORMATS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown formats: {', '.join(unknown)}")
+    return names
+
+
+def parse_args(argv=None):
+    """
+    Parse and check the command line options of convertNumbers.
+
+    Args:
+        argv (list of str, optional): The arguments; defaults to sys.argv[1:].
+
+    Returns:
+        argparse.Namespace: The options. Invalid combinations exit through parser.error.
+    """
+    parser = argparse.ArgumentParser(
+        description="Convert the integers of a file to binary and hexadecimal.")
+    parser.add_argument('file_path', help="text file with one integer per line")
+    parser.add_argument('--in-memory', action='store_true',
+                        help="load every number before converting (original behaviour)")
+    parser.add_argument('--fixed-width', action='store_true',
+                        help="skip the width pre-scan and use fixed column widths")
+    parser.add_argument('--formats', type=parse_formats, default=(),
+                        help="comma separated extra columns: " + ', '.join(OUTPUT_FORMATS))
+    parser.add_argument('--cache-size', type=int, default=0, metavar='N',
+                        help="memoize conversions of repeated values in an LRU cache of N "
+                             f"entries (e.g. {DEFAULT_CACHE_SIZE}) and report its hit rate")
+    parser.add_argument('--output', choices=list(OUTPUT_EXTENSIONS), default='txt',
+                        help="format of the saved results (default: aligned txt table)")
+    add_phase_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.in_memory and (args.formats or args.fixed_width):
+        parser.error("--formats and --fixed-width only apply to the streaming pipeline, "
+                     "not to --in-memory")
+    return args
+
+
+def main(argv=None):
+    """
+    Convert the numbers of the file given on the command line and save the results.
+
+    Args:
+        argv (list of str, optional): The command line arguments; defaults to sys.argv[1:].
+    """
+    args = parse_args(argv)
+    phase_timer = PhaseTimer(args.phases, args.trace_memory)
+    try:
+        process_file(args.file_path, args, phase_timer)
+    finally:
+        phase_timer.close()
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python process_file.py <file_path>")
-        sys.exit(1)
-    input_file_path = sys.argv[1]
-    process_file(input_file_path)
+    main()
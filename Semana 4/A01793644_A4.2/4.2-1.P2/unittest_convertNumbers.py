@@ -0,0 +1,208 @@
+import csv
+import io
+import json
+import os
+import random
+import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+import convertNumbers
+from convertNumbers import number_to_binary, number_to_hex, numbers_to_binary_and_hexa, \
+    vectorized_binary_and_hexa, iter_converted, scan_column_widths, stream_converted_numbers, \
+    to_radix, twos_complement, convert_number, format_width, OUTPUT_FORMATS, ConversionCache, \
+    save_converted_rows, load_converted_columnar
+
+
+EDGE_CASES = [0, 1, -1, -2, -4, -5, 255, -255, -512, -1000, -1023, -1024,
+              2 ** 32, -(2 ** 32), 2 ** 63 - 1, -(2 ** 63 - 1)]
+
+
+@unittest.skipIf(convertNumbers.np is None, "NumPy is not installed")
+class TestVectorizedConversion(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(42)
+        self.numbers = EDGE_CASES + \
+            [rng.randint(-2 ** 63 + 1, 2 ** 63 - 1) for _ in range(500)] + \
+            [rng.randint(-5000, 5000) for _ in range(500)]
+
+    def test_matches_scalar_functions(self):
+        """The NumPy path must produce exactly the scalar strings."""
+        bina, hexa = vectorized_binary_and_hexa(self.numbers)
+        self.assertEqual(bina, [number_to_binary(number) for number in self.numbers])
+        self.assertEqual(hexa, [number_to_hex(number) for number in self.numbers])
+
+    def test_arbitrary_precision_falls_back(self):
+        """Values outside the int64 range are left to the scalar path."""
+        self.assertIsNone(vectorized_binary_and_hexa([1, 2 ** 64]))
+        self.assertIsNone(vectorized_binary_and_hexa([-2 ** 63]))
+        numbers = self.numbers + [2 ** 70, -2 ** 70]
+        _, bina, hexa = numbers_to_binary_and_hexa(numbers)
+        self.assertEqual(bina[-1], number_to_binary(-2 ** 70))
+        self.assertEqual(hexa[-2], number_to_hex(2 ** 70))
+
+    def test_batch_matches_without_numpy(self):
+        """numbers_to_binary_and_hexa returns the same result with and without NumPy."""
+        expected = numbers_to_binary_and_hexa(self.numbers)
+        with patch.object(convertNumbers, 'np', None):
+            self.assertEqual(numbers_to_binary_and_hexa(self.numbers), expected)
+
+
+class TestRadixEngine(unittest.TestCase):
+    def test_to_radix_round_trips(self):
+        """to_radix agrees with int() parsing for every supported base."""
+        rng = random.Random(7)
+        values = [0, 1, 35, 36, 2 ** 64] + [rng.randint(0, 10 ** 30) for _ in range(200)]
+        for base in range(2, 37):
+            for value in values:
+                self.assertEqual(int(to_radix(value, base), base), value)
+        self.assertEqual(to_radix(255, 8), oct(255)[2:])
+
+    def test_twos_complement(self):
+        """Negative numbers are rendered as fixed-width words."""
+        self.assertEqual(twos_complement(-5, 8), 'FB')
+        self.assertEqual(twos_complement(-5, 8, base=2), '11111011')
+        self.assertEqual(twos_complement(-1, 64), 'F' * 16)
+        self.assertEqual(twos_complement(10, 16), '000A')
+        with self.assertRaises(ValueError):
+            twos_complement(-129, 8)
+
+    def test_convert_number_many_formats(self):
+        """A single call renders every format and matches its width estimate."""
+        formats = list(OUTPUT_FORMATS)
+        for number in EDGE_CASES + [-129, 128, 2 ** 70]:
+            results = convert_number(number, formats)
+            for name, result in zip(formats, results):
+                self.assertEqual(len(result), format_width(number, name))
+        self.assertEqual(convert_number(-5, ('oct', 'bin8', 'hex16', 'b36')),
+                         ['-5', '11111011', 'FFFB', '-5'])
+        self.assertEqual(convert_number(300, ('hex8', 'b32')), ['#N/A', '9C'])
+
+
+class TestConversionCache(unittest.TestCase):
+    def test_repeats_are_cache_hits(self):
+        """Repeated values are converted once and counted as hits."""
+        numbers = [5, -5, 5, 5, 300, -5] * 50
+        cache = ConversionCache(maxsize=8)
+        with patch.object(convertNumbers, 'number_to_binary',
+                          wraps=number_to_binary) as binary_mock, \
+                patch.object(convertNumbers, 'np', None):
+            result = numbers_to_binary_and_hexa(numbers, cache)
+        self.assertEqual(result, numbers_to_binary_and_hexa(numbers))
+        self.assertEqual(binary_mock.call_count, 3)
+        self.assertEqual(cache.misses, 3)
+        self.assertEqual(cache.hits, len(numbers) - 3)
+        self.assertAlmostEqual(cache.hit_rate(), (len(numbers) - 3) / len(numbers))
+
+    def test_least_recently_used_is_evicted(self):
+        """The cache never holds more than maxsize values."""
+        cache = ConversionCache(maxsize=2)
+        for batch in ([1, 2], [1], [3]):
+            numbers_to_binary_and_hexa(batch, cache)
+        self.assertEqual(list(cache.entries), [1, 3])
+        with self.assertRaises(ValueError):
+            ConversionCache(maxsize=0)
+
+
+class TestStreamingPipeline(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.input_path = os.path.join(self.temp_dir.name, 'numbers.txt')
+        self.output_path = os.path.join(self.temp_dir.name, 'ConversionResults.txt')
+        self.numbers = list(range(-300, 300, 7)) + [2 ** 40, -2 ** 40]
+        with open(self.input_path, 'w', encoding='utf-8') as file:
+            for number in self.numbers:
+                file.write(f"{number}\n")
+            file.write("ABC\n")
+
+    def test_iter_converted_matches_batch(self):
+        """Chunked conversion yields the same triples as the in-memory batch."""
+        expected = list(zip(*numbers_to_binary_and_hexa(self.numbers)))
+        self.assertEqual(list(iter_converted(iter(self.numbers), chunk_size=16)), expected)
+
+    def test_invalid_lines_reported_when_closed_early(self):
+        """A consumer that stops early still gets the invalid line summary."""
+        numbers = convertNumbers.iter_numbers(io.StringIO("x\n1\n2\n"))
+        with patch('sys.stdout', new_callable=io.StringIO) as output:
+            self.assertEqual(next(numbers), 1)
+            numbers.close()
+        self.assertEqual(output.getvalue().splitlines()[0], "Invalid data on 1 lines, skipped:")
+
+    def test_scan_column_widths(self):
+        """The pre-scan reports the widest rendered value of every column."""
+        _, bina, hexa = numbers_to_binary_and_hexa(self.numbers)
+        count, number_width, binary_width, hex_width = scan_column_widths(self.input_path)
+        self.assertEqual(count, len(self.numbers))
+        self.assertEqual(number_width, max(len(str(number)) for number in self.numbers))
+        self.assertEqual(binary_width, max(len(binary) for binary in bina))
+        self.assertEqual(hex_width, max(len(hexa_value) for hexa_value in hexa))
+
+    def test_stream_writes_every_row(self):
+        """Every valid number ends up in the saved table, in order."""
+        with patch('sys.stdout', new_callable=io.StringIO):
+            converted = stream_converted_numbers(self.input_path, self.output_path, 0.0)
+        self.assertEqual(converted, len(self.numbers))
+        with open(self.output_path, 'r', encoding='utf-8') as file:
+            lines = file.read().splitlines()
+        rows = [tuple(line.split()) for line in lines[1:-1]]
+        expected = [tuple(str(value) for value in triple)
+                    for triple in zip(*numbers_to_binary_and_hexa(self.numbers))]
+        self.assertEqual(rows, expected)
+        self.assertTrue(lines[-1].startswith("Elapsed Time:"))
+
+    def test_stream_matches_in_memory_table(self):
+        """The streamed table has the in-memory widths and reports invalid lines after it."""
+        with patch('sys.stdout', new_callable=io.StringIO) as output:
+            stream_converted_numbers(self.input_path, self.output_path, 0.0)
+        console = output.getvalue().splitlines()
+        self.assertEqual(console[0].split(), ['Number', 'Binary', 'Hexadecimal'])
+        self.assertEqual(console[len(self.numbers) + 1], "Invalid data on 1 lines, skipped:")
+        expected_path = os.path.join(self.temp_dir.name, 'expected.txt')
+        convertNumbers.save_converted_numbers(numbers_to_binary_and_hexa(self.numbers),
+                                              expected_path, 0.0)
+        with open(self.output_path, 'r', encoding='utf-8') as streamed, \
+                open(expected_path, 'r', encoding='utf-8') as expected:
+            self.assertEqual(streamed.readlines()[:-1], expected.readlines()[:-1])
+
+    def test_machine_readable_outputs(self):
+        """CSV, JSON lines and columnar files load back to the same rows."""
+        rows = list(zip(*numbers_to_binary_and_hexa(self.numbers)))
+        headers = ('number', 'binary', 'hexadecimal')
+        csv_path = os.path.join(self.temp_dir.name, 'rows.csv')
+        self.assertEqual(save_converted_rows(rows, csv_path, 'csv'), len(rows))
+        with open(csv_path, 'r', encoding='utf-8', newline='') as file:
+            loaded = list(csv.reader(file))
+        self.assertEqual(loaded[0], list(headers))
+        self.assertEqual([(int(row[0]), row[1], row[2]) for row in loaded[1:]], rows)
+
+        jsonl_path = os.path.join(self.temp_dir.name, 'rows.jsonl')
+        save_converted_rows(rows, jsonl_path, 'jsonl')
+        with open(jsonl_path, 'r', encoding='utf-8') as file:
+            loaded = [json.loads(line) for line in file]
+        self.assertEqual([tuple(record[header] for header in headers) for record in loaded], rows)
+
+        columnar_path = os.path.join(self.temp_dir.name, 'rows.cnv')
+        rows.append((2 ** 70, number_to_binary(2 ** 70), number_to_hex(2 ** 70)))
+        with patch.object(convertNumbers, 'STREAM_CHUNK_SIZE', 32):
+            save_converted_rows(rows, columnar_path, 'columnar')
+        columns = load_converted_columnar(columnar_path)
+        self.assertEqual(list(zip(*(columns[header] for header in headers))), rows)
+
+    def test_in_memory_honors_output_format(self):
+        """process_file saves the requested format on the in-memory path too."""
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir.name)
+        try:
+            with patch('sys.stdout', new_callable=io.StringIO):
+                convertNumbers.main([self.input_path, '--in-memory', '--output', 'jsonl'])
+            with open('ConversionResults.jsonl', 'r', encoding='utf-8') as file:
+                loaded = [json.loads(line)['number'] for line in file]
+        finally:
+            os.chdir(cwd)
+        self.assertEqual(loaded, self.numbers)
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir.name, 'ConversionResults.txt')))
+
+
+if __name__ == '__main__':
+    unittest.main()
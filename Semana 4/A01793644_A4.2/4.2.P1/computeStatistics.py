@@ -1,12 +1,23 @@
 """
 This module contains functions for processing data using sys, time, and collections.
 """
+import argparse
+import os
 import sys
 import time
 from collections import Counter
 
+try:
+    from instrumentation import PhaseTimer, add_phase_arguments
+    from number_parsing import ParseErrors, read_numbers
+except ModuleNotFoundError:
+    # Run from its own folder: the shared modules live at the root of the repository
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+    from instrumentation import PhaseTimer, add_phase_arguments
+    from number_parsing import ParseErrors, read_numbers
 
-def process_file(file_path):
+
+def process_file(file_path, timer=None):
     """
     Process a text file containing numerical data and compute statistics.
 
@@ -17,6 +28,8 @@ def process_file(file_path):
 
     Args:
         file_path (str): The path to the text file containing numerical data to be processed.
+        timer (PhaseTimer, optional): Times the read, parse, compute and write phases and
+            reports them after the results.
 
     Example:
         Given input file 'data.txt' with the following content:
@@ -29,8 +42,8 @@ def process_file(file_path):
 
     Note:
         - The function assumes that the input file contains one numerical value per line.
-        - Invalid data in the file will be skipped, and a message will be printed for each
-          invalid line.
+        - Invalid data in the file will be skipped, and a summary with the number of invalid
+          lines and the first few of them will be printed.
 
     Raises:
         ValueError: If no valid numeric data is found in the file.
@@ -39,26 +52,25 @@ def process_file(file_path):
         None
     """
     start_time = time.time()  # Start timing
+    timer = timer or PhaseTimer(enabled=False)
 
-    numbers = []  # Initialize an empty list to store valid numbers
+    errors = ParseErrors(float)
     try:
         with open(file_path, 'r', encoding='utf-8') as file:
-            for line_number, item in enumerate(file, start=1):
-                try:
-                    number = float(item.strip())
-                    numbers.append(number)
-                except ValueError:
-                    print(f"Invalid data on line {line_number}: \
-                          '{item.strip()}' is not a valid number. Skipping...")
-
-            if not numbers:
-                raise ValueError("No valid numeric data found in the file.")
+            numbers = read_numbers(file, float, errors, timer=timer)
+        errors.print_report()
+
+        if not numbers:
+            raise ValueError("No valid numeric data found in the file.")
+        with timer.phase('compute'):
             stats = compute_statistics(numbers)
-            elapsed_time = time.time() - start_time  # Compute elapsed time
-            stats['execution_time'] = elapsed_time
+        elapsed_time = time.time() - start_time  # Compute elapsed time
+        stats['execution_time'] = elapsed_time
 
+        with timer.phase('write'):
             print_statistics(stats)
             save_statistics(stats, 'StatisticsResults.txt')
+        timer.report('StatisticsResults.txt')
     except FileNotFoundError:
         print(f"File not found: {file_path}")
     except IOError as ioe:
@@ -211,8 +223,12 @@ def compute_mode(numbers):
     return mode
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python process_file.py <file_path>")
-        sys.exit(1)
-    input_file = sys.argv[1]
-    process_file(input_file)
+    parser = argparse.ArgumentParser(description="Compute descriptive statistics of a file.")
+    parser.add_argument('file_path', help="text file with one number per line")
+    add_phase_arguments(parser)
+    args = parser.parse_args()
+    phase_timer = PhaseTimer(args.phases, args.trace_memory)
+    try:
+        process_file(args.file_path, phase_timer)
+    finally:
+        phase_timer.close()
@@ -0,0 +1,77 @@
+"""
+This module benchmarks the word normalization and counting paths of wordCount.
+"""
+import argparse
+import os
+import random
+import time
+from tempfile import TemporaryDirectory
+
+from wordCount import count_word_frequencies, iter_words
+
+TC5_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'P3', 'TC5.txt')
+SIZE_SUFFIXES = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+
+
+def parse_size(text):
+    """
+    Parse a size such as '64M' or '1G' into bytes.
+    """
+    text = text.strip().upper()
+    if text and text[-1] in SIZE_SUFFIXES:
+        return int(float(text[:-1]) * SIZE_SUFFIXES[text[-1]])
+    return int(text)
+
+
+def write_synthetic_corpus(file_path, size, vocabulary_size=50000, seed=0):
+    """
+    Write roughly 'size' bytes of random words, with mixed case and punctuation, to a file.
+    """
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    vocabulary = [''.join(rng.choice(letters) for _ in range(rng.randint(2, 10)))
+                  for _ in range(vocabulary_size)]
+    decorated = vocabulary + [word.capitalize() for word in vocabulary[:5000]] + \
+        [word + rng.choice('.,;:!?') for word in vocabulary[:5000]]
+    block = ' '.join(rng.choice(decorated) for _ in range(200000)) + '\n'
+    written = 0
+    with open(file_path, 'w', encoding='utf-8') as file:
+        while written < size:
+            file.write(block)
+            written += len(block)
+
+
+def time_counting(file_path, fast, repetitions):
+    """
+    Return the best wall time, in seconds, of counting the words of a file.
+    """
+    best = float('inf')
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        count_word_frequencies(iter_words(file_path), fast=fast)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(file_path, label, repetitions):
+    """
+    Print the original and fast counting times of a file and the speedup.
+    """
+    original = time_counting(file_path, False, repetitions)
+    fast = time_counting(file_path, True, repetitions)
+    print(f"{label}: original {original:.4f}s, fast {fast:.4f}s, "
+          f"speedup {original / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark wordCount counting paths.")
+    parser.add_argument('--size', default='64M',
+                        help="size of the synthetic corpus, e.g. 64M or 1G (default 64M)")
+    parser.add_argument('--repetitions', type=int, default=3)
+    args = parser.parse_args()
+
+    run_benchmark(TC5_PATH, "P3/TC5.txt", max(args.repetitions, 10))
+    with TemporaryDirectory() as temp_dir:
+        corpus_path = os.path.join(temp_dir, 'corpus.txt')
+        write_synthetic_corpus(corpus_path, parse_size(args.size))
+        run_benchmark(corpus_path, f"synthetic {args.size}", args.repetitions)
@@ -0,0 +1,325 @@
+import csv
+import json
+import os
+import random
+import sys
+import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+import wordCount
+from wordCount import read_words_from_file, iter_words, count_word_frequencies, normalize_word, \
+    shard_offsets, count_words_parallel, top_k_exact, SpaceSaving, WordCountIndex, \
+    NGramCounter, VocabularyCounts, MappedVocabulary, write_results, save_word_counts
+
+
+class TestIterWords(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.file_path = os.path.join(self.temp_dir.name, 'words.txt')
+        rng = random.Random(3)
+        words = ['apple', 'Apple', 'banana!', 'x' * 40, 'naïve', 'a']
+        separators = [' ', '\n', '  ', '\t', ' \n ']
+        self.text = ''.join(rng.choice(words) + rng.choice(separators) for _ in range(2000))
+        self.text += 'trailing'
+        with open(self.file_path, 'w', encoding='utf-8') as file:
+            file.write(self.text)
+
+    def test_chunk_boundaries(self):
+        """Words split across chunks are rebuilt for any chunk size."""
+        expected = read_words_from_file(self.file_path)
+        for chunk_size in (1, 2, 3, 7, 64, 4096):
+            self.assertEqual(list(iter_words(self.file_path, chunk_size)), expected)
+
+    def test_counts_without_word_list(self):
+        """Counting a stream of words gives the same frequencies as counting the list."""
+        self.assertEqual(count_word_frequencies(iter_words(self.file_path, 5)),
+                         count_word_frequencies(read_words_from_file(self.file_path)))
+
+    def test_shards_never_cut_words(self):
+        """The words of all the shards, in order, are the words of the file."""
+        with patch.object(wordCount, 'MIN_SHARD_SIZE', 1):
+            shards = shard_offsets(self.file_path, 16)
+        self.assertGreater(len(shards), 1)
+        words = []
+        for start, end in shards:
+            words.extend(wordCount.split_chunks(
+                wordCount.iter_range_chunks(self.file_path, start, end, chunk_size=5)))
+        self.assertEqual(words, read_words_from_file(self.file_path))
+
+    def test_parallel_matches_sequential(self):
+        """Map-reduce counting of several files equals counting their words in sequence."""
+        expected = count_word_frequencies(read_words_from_file(self.file_path) * 2)
+        with patch.object(wordCount, 'MIN_SHARD_SIZE', 1):
+            for workers in (1, 2):
+                result = count_words_parallel([self.file_path, self.file_path], workers)
+                self.assertEqual(list(result.items()), list(expected.items()))
+
+
+class TestFastNormalization(unittest.TestCase):
+    def test_normalize_word_matches_original_expression(self):
+        """The translate fast path keeps the per-character semantics."""
+        words = ['Banana!', 'a-b', '--', '123', 'x\x7f', 'ΑΣ', 'İstanbul', 'Straße', 'ＡＢ', 'x²']
+        for word in words:
+            self.assertEqual(normalize_word(word),
+                             ''.join(char.lower() for char in word if char.isalnum()))
+
+    def test_fast_counting_keeps_order(self):
+        """Fast and original counting return the same dictionary in the same order."""
+        rng = random.Random(5)
+        tokens = ['Apple', 'apple!', 'ΑΣ', 'ß', '--', 'Orange', 'orange']
+        words = [rng.choice(tokens) for _ in range(1000)]
+        fast = count_word_frequencies(words)
+        original = count_word_frequencies(words, fast=False)
+        self.assertEqual(list(fast.items()), list(original.items()))
+
+
+class TestTopK(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(11)
+        vocabulary = [f"word{i}" for i in range(3000)]
+        weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+        self.words = rng.choices(vocabulary, weights, k=50000)
+        self.exact = count_word_frequencies(self.words)
+
+    def test_top_k_exact_matches_full_sort(self):
+        """nlargest gives the head of a stable sort by decreasing frequency."""
+        expected = sorted(self.exact.items(), key=lambda item: item[1], reverse=True)[:25]
+        self.assertEqual(top_k_exact(self.exact, 25), expected)
+
+    def test_space_saving_error_bounds(self):
+        """Estimated counts are within their reported error of the true counts."""
+        one_by_one = SpaceSaving(200)
+        for word in self.words:
+            one_by_one.add(word)
+        batched = SpaceSaving(200)
+        batched.update(self.words, batch_size=1000)
+        for summary in (one_by_one, batched):
+            self.assertEqual(summary.total, len(self.words))
+            self.assertLessEqual(len(summary.counts), 200)
+            for word, count, error in summary.top(20):
+                self.assertLessEqual(error, summary.max_error())
+                self.assertLessEqual(count - error, self.exact[word])
+                self.assertLessEqual(self.exact[word], count)
+            self.assertEqual([word for word, _, _ in summary.top(3)],
+                             [word for word, _ in top_k_exact(self.exact, 3)])
+
+    def test_error_bound_sets_capacity(self):
+        """The capacity follows the error bound unless a memory cap is lower."""
+        self.assertEqual(SpaceSaving.from_error_bound(0.01).capacity, 100)
+        self.assertEqual(SpaceSaving.from_error_bound(0.01, max_counters=10).capacity, 10)
+        for error_bound in (0, -0.5, 1, float('nan')):
+            with self.assertRaises(ValueError):
+                SpaceSaving.from_error_bound(error_bound)
+
+
+class TestWordCountIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.file_path = os.path.join(self.temp_dir.name, 'growing.txt')
+        self.index = WordCountIndex(os.path.join(self.temp_dir.name, 'counts.db'))
+        self.addCleanup(self.index.close)
+
+    def append(self, text):
+        with open(self.file_path, 'a', encoding='utf-8') as file:
+            file.write(text)
+
+    def test_appended_data_updates_counts(self):
+        """After every append the index matches a full recount, in the same order."""
+        rng = random.Random(9)
+        words = ['alpha', 'Beta', 'gam-ma', 'naïve', 'x']
+        separators = [' ', '\n', '\u3000', '']
+        text = ''
+        for _ in range(40):
+            piece = ''.join(rng.choice(words) + rng.choice(separators)
+                            for _ in range(rng.randint(0, 10)))
+            text += piece
+            self.append(piece)
+            self.index.update_file(self.file_path)
+            expected = count_word_frequencies(text.split())
+            self.assertEqual(list(self.index.counts().items()), list(expected.items()))
+
+    def test_unchanged_file_is_not_read_again(self):
+        """A second update without appended data tokenizes nothing."""
+        self.append("one two three\n")
+        self.assertEqual(self.index.update_file(self.file_path), 14)
+        self.assertEqual(self.index.update_file(self.file_path), 0)
+
+    def test_rewritten_file_is_rejected(self):
+        """Data changed before the checkpoint cannot be counted incrementally."""
+        self.append("one two three\n")
+        self.index.update_file(self.file_path)
+        with open(self.file_path, 'w', encoding='utf-8') as file:
+            file.write("four five six seven\n")
+        with self.assertRaises(ValueError):
+            self.index.update_file(self.file_path)
+
+
+class TestNGramCounter(unittest.TestCase):
+    def setUp(self):
+        self.words = "The cat sat. the CAT sat on the mat; the cat! --".split()
+
+    def test_bigrams_and_trigrams(self):
+        """N-grams are counted over normalized words, skipping empty ones."""
+        bigrams = NGramCounter(2)
+        bigrams.update(self.words)
+        self.assertEqual(dict(bigrams.items())[('the', 'cat')], 3)
+        self.assertEqual(bigrams.top(1), [(('the', 'cat'), 3)])
+        trigrams = NGramCounter(3)
+        trigrams.update(self.words[:5])
+        trigrams.update(self.words[5:])
+        self.assertEqual(trigrams.top(1), [(('the', 'cat', 'sat'), 2)])
+        self.assertEqual(sum(count for _, count in trigrams.items()), 9)
+        self.assertTrue(all(isinstance(word_id, int)
+                            for key in trigrams.counts for word_id in key))
+
+    def test_cooccurrence_window(self):
+        """Pairs at most 'window' words apart are counted once, without order."""
+        counter = NGramCounter(window=2)
+        counter.update("a b c a".split())
+        self.assertEqual(dict(counter.items()),
+                         {('a', 'b'): 2, ('a', 'c'): 2, ('b', 'c'): 1})
+
+    def test_pruning_bounds_memory(self):
+        """The table never grows past max_entries and reports the pruning threshold."""
+        rng = random.Random(4)
+        words = [f"w{rng.randint(0, 300)}" for _ in range(5000)] + ['hot', 'pair'] * 500
+        counter = NGramCounter(2, max_entries=1000)
+        counter.update(words)
+        self.assertLessEqual(len(counter.counts), 1000)
+        self.assertGreater(counter.pruned_below, 0)
+        self.assertEqual(counter.top(1)[0][0], ('hot', 'pair'))
+
+
+class TestVocabularyCounts(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        rng = random.Random(5)
+        self.words = [rng.choice(['apple', 'Apple!', 'naïve', 'zebra', 'b', '--', 'éclair'])
+                      for _ in range(3000)]
+
+    def test_counts_match_dictionary(self):
+        """Array-backed counts agree with count_word_frequencies, in the same order."""
+        vocabulary = VocabularyCounts()
+        vocabulary.update(self.words, batch_size=100)
+        self.assertEqual(list(vocabulary.items()),
+                         list(count_word_frequencies(self.words).items()))
+        self.assertEqual(vocabulary.counts.typecode, 'Q')
+
+    def test_keys_are_interned(self):
+        """The dictionary key of a word is the interned string kept in the word list."""
+        vocabulary = VocabularyCounts()
+        word = ''.join(['zeb', 'ra'])
+        vocabulary.add(word)
+        key = next(iter(vocabulary.ids))
+        self.assertIs(key, sys.intern('zebra'))
+        self.assertIs(key, vocabulary.words[0])
+
+    def test_main_saves_the_counted_vocabulary(self):
+        """--save-vocabulary writes the same counts as the results, in first-seen order."""
+        input_path = os.path.join(self.temp_dir.name, 'words.txt')
+        vocabulary_path = os.path.join(self.temp_dir.name, 'words.vocab')
+        with open(input_path, 'w', encoding='utf-8') as file:
+            file.write(' '.join(self.words))
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir.name)
+        try:
+            with patch('sys.stdout'):
+                wordCount.main([input_path, '--quiet', '--save-vocabulary', vocabulary_path])
+        finally:
+            os.chdir(cwd)
+        vocabulary = MappedVocabulary(vocabulary_path)
+        self.addCleanup(vocabulary.close)
+        self.assertEqual(list(vocabulary.items()),
+                         list(count_word_frequencies(self.words).items()))
+
+    def test_saved_file_is_queried_in_place(self):
+        """A saved vocabulary maps back with the same counts, lookups and top words."""
+        expected = count_word_frequencies(self.words)
+        file_path = os.path.join(self.temp_dir.name, 'words.vocab')
+        VocabularyCounts.from_counts(expected).save(file_path)
+        vocabulary = MappedVocabulary(file_path)
+        self.addCleanup(vocabulary.close)
+        self.assertEqual(len(vocabulary), len(expected))
+        self.assertEqual(list(vocabulary.items()), list(expected.items()))
+        for word, frequency in expected.items():
+            self.assertEqual(vocabulary.count(word), frequency)
+        self.assertEqual(vocabulary.count('missing'), 0)
+        self.assertEqual(vocabulary.top(2), top_k_exact(expected, 2))
+
+    def test_rejects_other_files(self):
+        """Files without the vocabulary header are refused."""
+        file_path = os.path.join(self.temp_dir.name, 'words.txt')
+        with open(file_path, 'wb') as file:
+            file.write(b'not a vocabulary file at all')
+        with self.assertRaises(ValueError):
+            MappedVocabulary(file_path)
+
+
+class TestResultSinks(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.rows = [('the', 2), ('"quoted",word', 5), ('naïve', 2), ('cat', 7)]
+
+    def test_text_report_format(self):
+        """The text report keeps the header, one line per word and the execution time."""
+        file_path = os.path.join(self.temp_dir.name, 'WordCountResults.txt')
+        write_results([f"{word}: {count}" for word, count in self.rows], 1.234, file_path)
+        with open(file_path, 'r', encoding='utf-8') as file:
+            lines = file.read().splitlines()
+        self.assertEqual(lines[0], "Words and their frequencies:")
+        self.assertEqual(lines[1:-1], ['the: 2', '"quoted",word: 5', 'naïve: 2', 'cat: 7'])
+        self.assertEqual(lines[-1], "Execution time: 1.23 seconds")
+
+    def test_machine_formats_sorted_by_frequency(self):
+        """JSON, CSV and TSV sinks load back most frequent first, ties in input order."""
+        expected = [('cat', 7), ('"quoted",word', 5), ('the', 2), ('naïve', 2)]
+        json_path = os.path.join(self.temp_dir.name, 'WordCountResults.json')
+        self.assertEqual(save_word_counts(self.rows, json_path, 'json'), len(self.rows))
+        with open(json_path, 'r', encoding='utf-8') as file:
+            loaded = json.load(file)
+        self.assertEqual([(record['word'], record['count']) for record in loaded], expected)
+        for output_format, delimiter in (('csv', ','), ('tsv', '\t')):
+            file_path = os.path.join(self.temp_dir.name, 'WordCountResults.' + output_format)
+            save_word_counts(self.rows, file_path, output_format)
+            with open(file_path, 'r', encoding='utf-8', newline='') as file:
+                loaded = list(csv.reader(file, delimiter=delimiter))
+            self.assertEqual(loaded[0], ['word', 'count'])
+            self.assertEqual([(word, int(count)) for word, count in loaded[1:]], expected)
+        with self.assertRaises(ValueError):
+            save_word_counts(self.rows, json_path, 'xml')
+
+
+class TestCommandLine(unittest.TestCase):
+    def test_main_counts_the_given_files(self):
+        """main(argv) runs the CLI without touching module globals."""
+        cwd = os.getcwd()
+        with TemporaryDirectory() as temp_dir:
+            input_path = os.path.join(temp_dir, 'words.txt')
+            with open(input_path, 'w', encoding='utf-8') as file:
+                file.write("the cat the dog the end\n")
+            os.chdir(temp_dir)
+            try:
+                with patch('sys.stdout'):
+                    wordCount.main([input_path, '--top', '2', '--output', 'tsv', '--quiet'])
+                with open('WordCountResults.tsv', 'r', encoding='utf-8', newline='') as file:
+                    loaded = list(csv.reader(file, delimiter='\t'))
+            finally:
+                os.chdir(cwd)
+        self.assertEqual(loaded, [['word', 'count'], ['the', '3'], ['cat', '1']])
+
+    def test_invalid_options_are_rejected(self):
+        """Invalid option values and combinations exit through parser.error."""
+        for argv in (['a.txt', '--workers', '-1'], ['a.txt', '--approximate'],
+                     ['a.txt', '--ngrams', '2', '--cooccurrence', '3'],
+                     ['a.txt', '--top', '3', '--approximate', '--error-bound', '0']):
+            with patch('sys.stderr'), self.assertRaises(SystemExit):
+                wordCount.parse_args(argv)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,64 @@
 """
 This module contains functions for processing data using sys, time, and collections.
 """
+import argparse
+import codecs
+import csv
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import os
+import sqlite3
+import string
+import struct
 import sys
 import time
+from array import array
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import accumulate, chain, islice
+from operator import itemgetter
+
+try:
+    from instrumentation import PhaseTimer, add_phase_arguments
+except ModuleNotFoundError:
+    # Run from its own folder: the shared modules live at the root of the repository
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+    from instrumentation import PhaseTimer, add_phase_arguments
+
+# Characters read from the input file per chunk by iter_words
+READ_CHUNK_SIZE = 1 << 20
+# ASCII words are normalized with one str.translate call: uppercase letters are mapped to
+# lowercase and every other non-alphanumeric ASCII character is deleted
+ASCII_NORMALIZE_TABLE = str.maketrans(
+    string.ascii_uppercase, string.ascii_lowercase,
+    ''.join(chr(code) for code in range(128) if not chr(code).isalnum()))
+# Raw tokens whose normalized form is remembered by cached_normalize_word
+NORMALIZE_CACHE_SIZE = 1 << 16
+# Files smaller than this are never split between several workers
+MIN_SHARD_SIZE = 1 << 20
+# Shards per worker process, so uneven shards still keep every worker busy
+SHARDS_PER_WORKER = 4
+# Bytes at which count_words_parallel may cut a file
+WHITESPACE_BYTES = frozenset(b' \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f')
+# Words counted exactly before they are merged into a SpaceSaving summary
+SPACE_SAVING_BATCH = 1 << 20
+# A SpaceSaving heap is rebuilt once it holds this many times its capacity in entries
+HEAP_COMPACTION_FACTOR = 4
+# Bytes before a checkpoint whose hash must still match for an incremental update
+FINGERPRINT_SIZE = 4096
+# First bytes of a file written by VocabularyCounts.save
+VOCABULARY_MAGIC = b'WCVOCAB1'
+# Buffer of the result files, so they are written in a few large system calls
+WRITE_BUFFER_SIZE = 1 << 20
+# File extension of each --output format
+OUTPUT_EXTENSIONS = {'txt': '.txt', 'json': '.json', 'csv': '.csv', 'tsv': '.tsv'}
+# Column names of the exact counts in the machine-readable outputs
+RESULT_HEADERS = ('word', 'count')
+
 
 def read_words_from_file(file_path):
     """
@@ -46,7 +102,241 @@ def read_words_from_file(file_path):
         sys.exit(1)
 
 
-def count_word_frequencies(word_list):
+def iter_words(file_path, chunk_size=READ_CHUNK_SIZE):
+    """
+    Lazily read the whitespace-separated words of a text file in fixed-size chunks.
+
+    This is the streaming counterpart of 'read_words_from_file': only one chunk of
+    'chunk_size' characters (plus the word that may straddle its end) is held in memory,
+    so arbitrarily large files can be tokenized. A word cut by a chunk boundary is carried
+    over and completed with the beginning of the next chunk, which makes the output
+    identical to file.read().split().
+
+    Args:
+        file_path (str): The path to the text file to read.
+        chunk_size (int): How many characters are read at a time.
+
+    Yields:
+        str: Each word of the file, in order.
+
+    Example:
+        Given input file "sample.txt" containing:
+        "The quick brown fox"
+        and chunk_size 6, the chunks are 'The qu', 'ick br', 'own fo', 'x' and the
+        output is still: 'The', 'quick', 'brown', 'fox'
+
+    Note:
+        - In case of a file not found error, the function prints an error message and exits,
+          like 'read_words_from_file'.
+    """
+    try:
+        file = open(file_path, 'r', encoding='utf-8')
+    except FileNotFoundError:
+        print(f"Error: The file '{file_path}' was not found.")
+        sys.exit(1)
+    with file:
+        yield from split_chunks(iter(lambda: file.read(chunk_size), ''))
+
+
+def split_chunks(chunks):
+    """
+    Split a stream of text chunks into whitespace-separated words.
+
+    Args:
+        chunks (iterable of str): Consecutive pieces of a text, cut anywhere.
+
+    Yields:
+        str: Each word of the text, with the words cut by chunk boundaries rebuilt.
+    """
+    carry = ''
+    for chunk in chunks:
+        if not chunk:
+            continue
+        chunk_words = (carry + chunk).split()
+        # The last word may continue in the next chunk unless whitespace ends this one
+        carry = '' if chunk[-1].isspace() or not chunk_words else chunk_words.pop()
+        yield from chunk_words
+    if carry:
+        yield carry
+
+
+def shard_offsets(file_path, shards):
+    """
+    Split a file into byte ranges that never cut a word.
+
+    Every cut is moved forward to the next ASCII whitespace byte. Such a byte can never
+    be part of a multi-byte UTF-8 character, so each range decodes on its own and the words
+    of all the ranges, in order, are exactly the words of the file.
+
+    Args:
+        file_path (str): The path to the text file to split.
+        shards (int): The desired number of ranges.
+
+    Returns:
+        list of tuple: (start, end) byte offsets; fewer than 'shards' for small files.
+    """
+    size = os.path.getsize(file_path)
+    shards = max(1, min(shards, size // MIN_SHARD_SIZE))
+    offsets = [0]
+    with open(file_path, 'rb') as file:
+        for index in range(1, shards):
+            position = max(size * index // shards, offsets[-1])
+            file.seek(position)
+            while position < size:
+                block = file.read(4096)
+                cut = next((i for i, byte in enumerate(block) if byte in WHITESPACE_BYTES), None)
+                if cut is not None:
+                    position += cut
+                    break
+                position += len(block)
+            if position >= size:
+                break
+            offsets.append(position)
+    offsets.append(size)
+    return [(start, end) for start, end in zip(offsets, offsets[1:]) if end > start]
+
+
+def iter_range_chunks(file_path, start, end, chunk_size=READ_CHUNK_SIZE):
+    """
+    Read the bytes [start, end) of a UTF-8 file as decoded text chunks.
+
+    Args:
+        file_path (str): The path to the text file to read.
+        start (int): First byte offset, included.
+        end (int): Last byte offset, excluded.
+        chunk_size (int): How many bytes are read at a time.
+
+    Yields:
+        str: The decoded text of the range, chunk by chunk.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    with open(file_path, 'rb') as file:
+        file.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = file.read(min(chunk_size, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield decoder.decode(block)
+    yield decoder.decode(b'', final=True)
+
+
+def count_shard(task):
+    """
+    Count the word frequencies of one byte range of a file (the map step).
+
+    Args:
+        task (tuple): (file_path, start, end) as produced from 'shard_offsets'.
+
+    Returns:
+        dict: The word frequencies of the range, in first-occurrence order.
+    """
+    file_path, start, end = task
+    return count_word_frequencies(split_chunks(iter_range_chunks(file_path, start, end)))
+
+
+def merge_counts(left, right):
+    """
+    Add the counts of 'right' into 'left' and return 'left'.
+
+    Words new to 'left' are appended in the order they appear in 'right', so merging the
+    counts of consecutive shards from left to right keeps the first-occurrence order of
+    a sequential count.
+    """
+    for word, frequency in right.items():
+        left[word] = left.get(word, 0) + frequency
+    return left
+
+
+def tree_reduce(partial_counts):
+    """
+    Merge a list of word counts pairwise, in rounds, until one remains (the reduce step).
+
+    Adjacent counts are always merged left into right order, so the result is identical to
+    counting all the shards sequentially.
+
+    Args:
+        partial_counts (list of dict): The counts of consecutive shards.
+
+    Returns:
+        dict: The merged word frequencies.
+    """
+    level = list(partial_counts) or [{}]
+    while len(level) > 1:
+        merged = [merge_counts(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            merged.append(level[-1])
+        level = merged
+    return level[0]
+
+
+def count_words_parallel(file_paths, workers=None):
+    """
+    Count the word frequencies of one or many files with a map-reduce over a process pool.
+
+    Each file is split into whitespace-safe byte ranges ('shard_offsets'), the ranges are
+    counted in parallel by 'count_shard', and the partial counts are merged by 'tree_reduce'.
+    The result is exactly what 'count_word_frequencies' gives for the concatenated words of
+    the files, in the same order.
+
+    Args:
+        file_paths (list of str): The text files to count, in order.
+        workers (int, optional): Worker processes; defaults to os.cpu_count().
+
+    Returns:
+        dict: A dictionary where keys are unique words, and values are their frequencies.
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = []
+    for file_path in file_paths:
+        if not os.path.isfile(file_path):
+            print(f"Error: The file '{file_path}' was not found.")
+            sys.exit(1)
+        shards = shard_offsets(file_path, workers * SHARDS_PER_WORKER)
+        tasks.extend((file_path, start, end) for start, end in shards)
+    if workers == 1 or len(tasks) <= 1:
+        return tree_reduce([count_shard(task) for task in tasks])
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        partial_counts = list(executor.map(count_shard, tasks))
+    return tree_reduce(partial_counts)
+
+
+def normalize_word(word):
+    """
+    Remove the non-alphanumeric characters of a word and convert it to lowercase.
+
+    ASCII words, by far the most common, take a single str.translate call. Any other word
+    goes through the original per-character expression, so Unicode results (such as
+    characters whose lowercase form has several code points) are unchanged.
+
+    Args:
+        word (str): A raw whitespace-separated token.
+
+    Returns:
+        str: The normalized word, possibly empty.
+
+    Example:
+        Given input word: 'Banana!'
+        Output: 'banana'
+    """
+    if word.isascii():
+        return word.translate(ASCII_NORMALIZE_TABLE)
+    return ''.join(char.lower() for char in word if char.isalnum())
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def cached_normalize_word(word):
+    """
+    Return normalize_word(word), remembering the most recent raw tokens.
+
+    Used where tokens are processed one at a time (see 'NGramCounter') and cannot be
+    pre-aggregated with a Counter first.
+    """
+    return normalize_word(word)
+
+
+def count_word_frequencies(word_list, fast=True):
     """
     Count the frequencies of words in a list of words.
 
@@ -56,7 +346,13 @@ def count_word_frequencies(word_list):
     their respective frequencies in the input list.
 
     Args:
-        words (list of str): A list of words to count the frequencies of.
+        words (iterable of str): The words to count the frequencies of. Any iterable works,
+            so the words of 'iter_words' are counted without building a list.
+        fast (bool): When True (the default) the raw tokens are first counted with
+            collections.Counter, which runs in C, and every distinct token is normalized
+            only once with 'normalize_word'. When False every token is normalized on its
+            own, as the original implementation did. Both give the same dictionary, in the
+            same order.
 
     Returns:
         dict: A dictionary where keys are unique words, and values are their frequencies.
@@ -77,6 +373,13 @@ def count_word_frequencies(word_list):
         - Empty words are ignored in the counting process.
     """
     word_freq = {}
+    if fast:
+        # Counter keeps first-occurrence order, so the cleaned words keep it too
+        for raw_word, raw_count in Counter(word_list).items():
+            cleaned_word = normalize_word(raw_word)
+            if cleaned_word:
+                word_freq[cleaned_word] = word_freq.get(cleaned_word, 0) + raw_count
+        return word_freq
     for word_in_list in word_list:
         # Remove any non-alphanumeric characters and convert to lowercase
         cleaned_word = ''.join(char.lower() for char in word_in_list if char.isalnum())
@@ -84,35 +387,787 @@ def count_word_frequencies(word_list):
             word_freq[cleaned_word] = word_freq.get(cleaned_word, 0) + 1
     return word_freq
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python your_program.py input_file.txt")
+
+def top_k_exact(word_freq, k):
+    """
+    Return the 'k' most frequent words of exact counts, most frequent first.
+
+    heapq.nlargest keeps a heap of only 'k' entries instead of sorting the whole vocabulary.
+    Words with the same frequency keep their first-occurrence order.
+
+    Args:
+        word_freq (dict): Word frequencies, as returned by 'count_word_frequencies'.
+        k (int): How many words to return.
+
+    Returns:
+        list of tuple: (word, frequency) pairs.
+
+    Example:
+        Given input word_freq {'apple': 2, 'banana': 5, 'orange': 2} and k 2
+        Output: [('banana', 5), ('apple', 2)]
+    """
+    return heapq.nlargest(k, word_freq.items(), key=itemgetter(1))
+
+
+class SpaceSaving:
+    """
+    Space-Saving summary of the heavy hitters of a word stream in bounded memory.
+
+    At most 'capacity' words are monitored. When a new word arrives and the summary is full,
+    the word with the smallest count is evicted and the new word inherits that count as its
+    error. Every reported count overestimates the true frequency by at most its error, and
+    every error is at most total / capacity, so any word more frequent than that is always
+    monitored.
+    """
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("The capacity must be a positive integer.")
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.heap = []
+        self.total = 0
+
+    @classmethod
+    def from_error_bound(cls, error_bound, max_counters=None):
+        """
+        Build a summary whose counts are off by at most error_bound * total.
+
+        Args:
+            error_bound (float): Relative error, e.g. 0.001 for 0.1% of the total.
+            max_counters (int, optional): Memory cap; when it is below 1 / error_bound the
+                summary uses it and the guaranteed error is total / max_counters instead.
+
+        Raises:
+            ValueError: If error_bound is not strictly between 0 and 1.
+        """
+        if not 0 < error_bound < 1:
+            raise ValueError(f"The error bound must be between 0 and 1, got {error_bound}.")
+        capacity = math.ceil(1 / error_bound)
+        if max_counters:
+            capacity = min(capacity, max_counters)
+        return cls(capacity)
+
+    def add(self, word, increment=1):
+        """
+        Count 'increment' occurrences of a word.
+        """
+        self.total += increment
+        if word in self.counts:
+            self.counts[word] += increment
+            heapq.heappush(self.heap, (self.counts[word], word))
+        elif len(self.counts) < self.capacity:
+            self.counts[word] = increment
+            self.errors[word] = 0
+            heapq.heappush(self.heap, (increment, word))
+        else:
+            minimum, evicted = self.pop_minimum()
+            del self.counts[evicted]
+            del self.errors[evicted]
+            self.counts[word] = minimum + increment
+            self.errors[word] = minimum
+            heapq.heappush(self.heap, (minimum + increment, word))
+        if len(self.heap) > HEAP_COMPACTION_FACTOR * self.capacity:
+            # Drop the stale entries left behind by increments
+            self.heap = [(count, word) for word, count in self.counts.items()]
+            heapq.heapify(self.heap)
+
+    def pop_minimum(self):
+        """
+        Remove and return the (count, word) entry of the least frequent monitored word.
+        """
+        while True:
+            count, word = heapq.heappop(self.heap)
+            if self.counts.get(word) == count:
+                return count, word
+
+    def update(self, word_list, batch_size=SPACE_SAVING_BATCH):
+        """
+        Count a stream of words, normalized like 'count_word_frequencies'.
+
+        The stream is counted exactly in batches of 'batch_size' words and every batch is
+        merged into the summary at once: a word not monitored yet enters with the current
+        minimum count as its error, and only the 'capacity' largest counts are kept. This is
+        the mergeable form of Space-Saving and keeps the same total / capacity error bound.
+        """
+        iterator = iter(word_list)
+        for first_word in iterator:
+            # The batch is counted straight from the iterator, never held as a list
+            self.merge(count_word_frequencies(chain([first_word],
+                                                    islice(iterator, batch_size - 1))))
+
+    def merge(self, word_freq):
+        """
+        Merge exact word frequencies into the summary.
+        """
+        floor = min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+        counts = self.counts
+        errors = self.errors
+        for word, frequency in word_freq.items():
+            self.total += frequency
+            if word in counts:
+                counts[word] += frequency
+            else:
+                counts[word] = floor + frequency
+                errors[word] = floor
+        if len(counts) > self.capacity:
+            kept = heapq.nlargest(self.capacity, counts.items(), key=itemgetter(1))
+            self.counts = dict(kept)
+            self.errors = {word: errors[word] for word, _ in kept}
+        self.heap = [(count, word) for word, count in self.counts.items()]
+        heapq.heapify(self.heap)
+
+    def max_error(self):
+        """
+        Return the largest possible overestimation of any reported count.
+        """
+        return self.total // self.capacity
+
+    def top(self, k):
+        """
+        Return the 'k' words with the largest estimated counts, most frequent first.
+
+        Returns:
+            list of tuple: (word, estimated count, error) triples.
+        """
+        return [(word, count, self.errors[word])
+                for word, count in heapq.nlargest(k, self.counts.items(), key=itemgetter(1))]
+
+
+class WordCountIndex:
+    """
+    Persistent word counts in a SQLite database, updated incrementally as files grow.
+
+    For every file the index keeps a checkpoint of the bytes already counted, so a later
+    update only tokenizes the data appended since. The words of the file's last incomplete
+    line of text (after its last ASCII whitespace byte) may continue in the appended data,
+    so they are subtracted and counted again together with it. Words keep the order in
+    which they were first counted, like the dictionary of 'count_word_frequencies'.
+    """
+    def __init__(self, db_path):
+        self.connection = sqlite3.connect(db_path)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS word_counts (
+                word TEXT PRIMARY KEY,
+                count INTEGER NOT NULL,
+                seq INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                file_path TEXT PRIMARY KEY,
+                tail_start INTEGER NOT NULL,
+                processed_end INTEGER NOT NULL,
+                fingerprint TEXT NOT NULL
+            );
+        """)
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        self.connection.close()
+
+    def update_file(self, file_path):
+        """
+        Count the data appended to a file since its last checkpoint.
+
+        Args:
+            file_path (str): The text file to count. Files are identified by absolute path.
+
+        Returns:
+            int: How many bytes were tokenized.
+
+        Raises:
+            ValueError: If the data already counted changed, which means the file was not
+                only appended to; the index must then be rebuilt.
+        """
+        key = os.path.abspath(file_path)
+        size = os.path.getsize(file_path)
+        row = self.connection.execute(
+            "SELECT tail_start, processed_end, fingerprint FROM checkpoints WHERE file_path = ?",
+            (key,)).fetchone()
+        tail_start, processed_end = (row[0], row[1]) if row else (0, 0)
+        if row and (size < processed_end or
+                    file_fingerprint(file_path, processed_end) != row[2]):
+            raise ValueError(f"'{file_path}' changed before its checkpoint; rebuild the index.")
+        if size == processed_end:
+            return 0
+        with self.connection:
+            # The words after the last whitespace may continue in the appended data
+            self.subtract(count_shard((file_path, tail_start, processed_end)))
+            self.add(count_shard((file_path, tail_start, size)))
+            self.connection.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?)",
+                (key, last_word_start(file_path, size), size, file_fingerprint(file_path, size)))
+        return size - tail_start
+
+    def add(self, word_freq):
+        """
+        Add word frequencies to the stored counts, appending new words in order.
+        """
+        next_seq = self.connection.execute(
+            "SELECT COALESCE(MAX(seq), 0) + 1 FROM word_counts").fetchone()[0]
+        self.connection.executemany(
+            "INSERT INTO word_counts (word, count, seq) VALUES (?, ?, ?) "
+            "ON CONFLICT(word) DO UPDATE SET count = count + excluded.count",
+            ((word, frequency, next_seq + position)
+             for position, (word, frequency) in enumerate(word_freq.items())))
+
+    def subtract(self, word_freq):
+        """
+        Subtract word frequencies from the stored counts, dropping words that reach zero.
+        """
+        if not word_freq:
+            return
+        self.connection.executemany(
+            "UPDATE word_counts SET count = count - ? WHERE word = ?",
+            ((frequency, word) for word, frequency in word_freq.items()))
+        self.connection.execute("DELETE FROM word_counts WHERE count <= 0")
+
+    def counts(self):
+        """
+        Return the stored word frequencies in first-counted order.
+        """
+        return dict(self.connection.execute(
+            "SELECT word, count FROM word_counts ORDER BY seq"))
+
+
+def last_word_start(file_path, size):
+    """
+    Return the offset just after the last ASCII whitespace byte before 'size' (0 if none).
+    """
+    with open(file_path, 'rb') as file:
+        position = size
+        while position > 0:
+            start = max(0, position - 4096)
+            file.seek(start)
+            block = file.read(position - start)
+            for index in range(len(block) - 1, -1, -1):
+                if block[index] in WHITESPACE_BYTES:
+                    return start + index + 1
+            position = start
+    return 0
+
+
+def file_fingerprint(file_path, end):
+    """
+    Return a SHA-256 hex digest of the FINGERPRINT_SIZE bytes that end at offset 'end'.
+    """
+    start = max(0, end - FINGERPRINT_SIZE)
+    with open(file_path, 'rb') as file:
+        file.seek(start)
+        return hashlib.sha256(file.read(end - start)).hexdigest()
+
+
+class Vocabulary:
+    """
+    Interned words mapped to dense integer IDs, in first-seen order.
+    """
+    def __init__(self):
+        self.ids = {}
+        self.words = []
+
+    def intern(self, word):
+        """
+        Return the ID of a word, assigning the next free ID to a new word.
+        """
+        word_id = self.ids.get(word)
+        if word_id is None:
+            # The dictionary key and the word list share the interned string
+            word = sys.intern(word)
+            word_id = self.ids[word] = len(self.words)
+            self.words.append(word)
+        return word_id
+
+    def __len__(self):
+        return len(self.words)
+
+
+class VocabularyCounts(Vocabulary):
+    """
+    Interned vocabulary with the frequency of every word in a dense array('Q').
+
+    Word IDs index straight into the counts array, so each count takes 8 bytes instead of a
+    boxed int and a dict slot. 'save' writes the whole structure in a layout that
+    'MappedVocabulary' can memory-map and query without parsing it.
+    """
+    def __init__(self):
+        super().__init__()
+        self.counts = array('Q')
+
+    @classmethod
+    def from_counts(cls, word_freq):
+        """
+        Build a vocabulary from a dictionary of word frequencies, keeping its order.
+        """
+        vocabulary = cls()
+        for word, frequency in word_freq.items():
+            vocabulary.add(word, frequency)
+        return vocabulary
+
+    def add(self, word, frequency=1):
+        """
+        Add 'frequency' occurrences of an already normalized word.
+        """
+        word_id = self.intern(word)
+        if word_id == len(self.counts):
+            self.counts.append(0)
+        self.counts[word_id] += frequency
+
+    def update(self, word_list, batch_size=SPACE_SAVING_BATCH):
+        """
+        Count a stream of raw words, normalized like 'count_word_frequencies'.
+        """
+        iterator = iter(word_list)
+        for first_word in iterator:
+            batch = count_word_frequencies(chain([first_word], islice(iterator, batch_size - 1)))
+            for word, frequency in batch.items():
+                self.add(word, frequency)
+
+    def items(self):
+        """
+        Yield (word, frequency) pairs in first-seen order.
+        """
+        return zip(self.words, self.counts)
+
+    def save(self, file_path):
+        """
+        Write the vocabulary in the memory-mappable layout read by 'MappedVocabulary'.
+
+        All integers are little-endian uint64, so every array is 8-byte aligned:
+        the magic, the word count n, the size of the text blob, the n counts, the n + 1
+        offsets of each word in the blob, the n word IDs sorted by the words' UTF-8 bytes
+        (for binary search), and finally the UTF-8 blob of all the words.
+        """
+        encoded = [word.encode('utf-8') for word in self.words]
+        offsets = array('Q', [0])
+        offsets.extend(accumulate(len(word) for word in encoded))
+        sorted_ids = array('Q', sorted(range(len(encoded)), key=encoded.__getitem__))
+        arrays = [self.counts, offsets, sorted_ids]
+        if sys.byteorder != 'little':
+            arrays = [array('Q', values) for values in arrays]
+            for values in arrays:
+                values.byteswap()
+        with open(file_path, 'wb') as file:
+            file.write(VOCABULARY_MAGIC)
+            file.write(struct.pack('<QQ', len(encoded), offsets[-1]))
+            for values in arrays:
+                file.write(values.tobytes())
+            file.write(b''.join(encoded))
+
+
+class MappedVocabulary:
+    """
+    Read-only view of a file written by VocabularyCounts.save, memory-mapped in place.
+
+    Opening it only maps the file: counts, offsets and the sorted index are memoryviews
+    over the mapping (zero-copy), and words are decoded only when they are looked at, so
+    even huge vocabularies are ready for queries at once.
+    """
+    def __init__(self, file_path):
+        if sys.byteorder != 'little':
+            raise ValueError("Memory-mapped vocabularies need a little-endian machine.")
+        with open(file_path, 'rb') as file:
+            self.mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mapping[:len(VOCABULARY_MAGIC)] != VOCABULARY_MAGIC:
+            self.mapping.close()
+            raise ValueError(f"'{file_path}' is not a vocabulary file.")
+        self.size, blob_size = struct.unpack_from('<QQ', self.mapping, len(VOCABULARY_MAGIC))
+        view = memoryview(self.mapping)
+        # Start of the counts, offsets, sorted IDs and blob sections
+        starts = list(accumulate((8 * self.size, 8 * (self.size + 1), 8 * self.size),
+                                 initial=len(VOCABULARY_MAGIC) + 16))
+        self.counts = view[starts[0]:starts[1]].cast('Q')
+        self.offsets = view[starts[1]:starts[2]].cast('Q')
+        self.sorted_ids = view[starts[2]:starts[3]].cast('Q')
+        self.blob = view[starts[3]:starts[3] + blob_size]
+
+    def close(self):
+        """
+        Release the memoryviews and unmap the file.
+        """
+        for section in (self.counts, self.offsets, self.sorted_ids, self.blob):
+            section.release()
+        self.mapping.close()
+
+    def __len__(self):
+        return self.size
+
+    def word_bytes(self, word_id):
+        """
+        Return the UTF-8 bytes of a word ID, copied out of the mapping.
+        """
+        return bytes(self.blob[self.offsets[word_id]:self.offsets[word_id + 1]])
+
+    def word(self, word_id):
+        """
+        Return the word of an ID.
+        """
+        return self.word_bytes(word_id).decode('utf-8')
+
+    def count(self, word):
+        """
+        Return the frequency of a word (0 if absent) with a binary search over the index.
+        """
+        target = word.encode('utf-8')
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if self.word_bytes(self.sorted_ids[middle]) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.size and self.word_bytes(self.sorted_ids[low]) == target:
+            return self.counts[self.sorted_ids[low]]
+        return 0
+
+    def items(self):
+        """
+        Yield (word, frequency) pairs in the saved order.
+        """
+        for word_id in range(self.size):
+            yield self.word(word_id), self.counts[word_id]
+
+    def top(self, k):
+        """
+        Return the 'k' most frequent (word, frequency) pairs, most frequent first.
+        """
+        word_ids = heapq.nlargest(k, range(self.size), key=self.counts.__getitem__)
+        return [(self.word(word_id), self.counts[word_id]) for word_id in word_ids]
+
+
+class NGramCounter:
+    """
+    Count n-grams or windowed co-occurrence pairs of a word stream.
+
+    Words are normalized like 'count_word_frequencies' (empty words are skipped) and
+    interned into a Vocabulary, so every key is a compact tuple of integer IDs. The last
+    words are kept in a ring buffer (a deque with a maximum length) as the window slides.
+
+    With 'window' unset, each key is an n-gram of 'n' consecutive words. With 'window' set,
+    each key is an unordered pair of words at most 'window' positions apart, stored with the
+    smaller ID first.
+
+    With 'max_entries' set, memory is bounded by pruning on the fly: whenever the table
+    grows past 'max_entries' keys, the keys counted fewer than the current threshold are
+    dropped and the threshold doubles until the table is at most three quarters full. The
+    counts of the keys that survive are then lower bounds, and 'pruned_below' tells by how
+    much a dropped key may have been undercounted.
+    """
+    def __init__(self, n=2, window=None, max_entries=None):
+        if n < 1 or (window is not None and window < 1):
+            raise ValueError("The n-gram size and the window must be positive integers.")
+        self.n = n
+        self.window = window
+        self.max_entries = max_entries
+        self.vocabulary = Vocabulary()
+        self.counts = {}
+        self.pruned_below = 0
+        self.ring = deque(maxlen=window if window is not None else n)
+
+    def update(self, word_list):
+        """
+        Count the n-grams or co-occurrences of a stream of raw words.
+
+        The window keeps sliding across calls, so files can be fed one after another.
+        """
+        counts = self.counts
+        ring = self.ring
+        intern = self.vocabulary.intern
+        for raw_word in word_list:
+            word = cached_normalize_word(raw_word)
+            if not word:
+                continue
+            word_id = intern(word)
+            if self.window is None:
+                ring.append(word_id)
+                if len(ring) == self.n:
+                    key = tuple(ring)
+                    counts[key] = counts.get(key, 0) + 1
+            else:
+                for previous_id in ring:
+                    key = (previous_id, word_id) if previous_id <= word_id \
+                        else (word_id, previous_id)
+                    counts[key] = counts.get(key, 0) + 1
+                ring.append(word_id)
+            if self.max_entries and len(counts) > self.max_entries:
+                self.prune()
+                counts = self.counts
+
+    def prune(self):
+        """
+        Drop the rarest keys until the table is at most three quarters of 'max_entries'.
+        """
+        threshold = max(2, self.pruned_below)
+        target = self.max_entries * 3 // 4
+        while len(self.counts) > target:
+            self.counts = {key: count for key, count in self.counts.items()
+                           if count >= threshold}
+            self.pruned_below = threshold
+            threshold *= 2
+
+    def items(self):
+        """
+        Yield (words, count) pairs in first-counted order, with words as a tuple of str.
+        """
+        words = self.vocabulary.words
+        for key, count in self.counts.items():
+            yield tuple(words[word_id] for word_id in key), count
+
+    def top(self, k):
+        """
+        Return the 'k' most frequent keys as (words, count) pairs, most frequent first.
+        """
+        words = self.vocabulary.words
+        return [(tuple(words[word_id] for word_id in key), count)
+                for key, count in heapq.nlargest(k, self.counts.items(), key=itemgetter(1))]
+
+
+def write_results(result_lines, execution_time, file_name="WordCountResults.txt"):
+    """
+    Write the text report with a single buffered writelines call.
+
+    Args:
+        result_lines (list of str): The report lines, e.g. "word: 3".
+        execution_time (float): Seconds to report at the end of the file.
+        file_name (str): The name of the report file.
+    """
+    with open(file_name, "w", encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as result_file:
+        result_file.write("Words and their frequencies:\n")
+        result_file.writelines(f"{line}\n" for line in result_lines)
+        result_file.write(f"Execution time: {execution_time:.2f} seconds\n")
+
+
+def save_word_counts(rows, file_name, output_format, headers=RESULT_HEADERS):
+    """
+    Save counted rows in a machine-readable format, most frequent first.
+
+    The sort is stable, so words with the same frequency keep their order of appearance.
+
+    Args:
+        rows (iterable of tuple): (word, count, ...) rows.
+        file_name (str): The name of the file where the rows will be saved.
+        output_format (str): 'json', 'csv' or 'tsv'.
+        headers (tuple of str): Column names, one per value of each row.
+
+    Returns:
+        int: The number of rows written.
+
+    Example:
+        Given rows [('the', 2), ('cat', 5)] and output_format 'tsv', the file contains:
+        word    count
+        cat     5
+        the     2
+    """
+    rows = sorted(rows, key=itemgetter(1), reverse=True)
+    with open(file_name, 'w', encoding='utf-8', newline='',
+              buffering=WRITE_BUFFER_SIZE) as target:
+        if output_format == 'json':
+            target.write('[\n')
+            target.write(',\n'.join(
+                '{' + ', '.join(f'"{header}": {json.dumps(value, ensure_ascii=False)}'
+                                for header, value in zip(headers, row)) + '}'
+                for row in rows))
+            target.write('\n]\n' if rows else ']\n')
+        elif output_format in ('csv', 'tsv'):
+            writer = csv.writer(target, delimiter=',' if output_format == 'csv' else '\t',
+                                lineterminator='\n')
+            writer.writerow(headers)
+            writer.writerows(rows)
+        else:
+            raise ValueError(f"Unknown output format: {output_format}")
+    return len(rows)
+
+
+def parse_args(argv=None):
+    """
+    Parse and check the command line options of wordCount.
+
+    Args:
+        argv (list of str, optional): The arguments; defaults to sys.argv[1:].
+
+    Returns:
+        argparse.Namespace: The options. Invalid combinations exit through parser.error.
+    """
+    parser = argparse.ArgumentParser(description="Count the word frequencies of text files.")
+    parser.add_argument('input_files', nargs='+', help="text files to count, in order")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="count in a map-reduce over this many processes (0 = all cores)")
+    parser.add_argument('--top', type=int, metavar='K',
+                        help="only report the K most frequent words, most frequent first")
+    parser.add_argument('--approximate', action='store_true',
+                        help="with --top, use a bounded-memory Space-Saving summary")
+    parser.add_argument('--error-bound', type=float, default=0.0001,
+                        help="with --approximate, maximum overcount as a fraction of all "
+                             "words (default 0.0001)")
+    parser.add_argument('--max-counters', type=int,
+                        help="with --approximate, cap on the monitored words")
+    parser.add_argument('--index', metavar='DB',
+                        help="keep the counts in this SQLite file and only count the data "
+                             "appended to the input files since the previous run")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="with --index, discard the stored counts and count everything")
+    parser.add_argument('--ngrams', type=int, metavar='N',
+                        help="count sequences of N consecutive words instead of single words")
+    parser.add_argument('--cooccurrence', type=int, metavar='W',
+                        help="count pairs of words at most W positions apart")
+    parser.add_argument('--max-entries', type=int,
+                        help="with --ngrams/--cooccurrence, prune rare keys to stay below "
+                             "this many entries")
+    parser.add_argument('--save-vocabulary', metavar='PATH',
+                        help="also save the exact counts as a memory-mappable vocabulary file")
+    parser.add_argument('--output', choices=list(OUTPUT_EXTENSIONS), default='txt',
+                        help="result file format; json, csv and tsv are sorted by frequency "
+                             "(default txt)")
+    parser.add_argument('--quiet', action='store_true',
+                        help="do not print every word to the console")
+    add_phase_arguments(parser, "counting and writing")
+    args = parser.parse_args(argv)
+    if args.workers < 0:
+        parser.error("--workers must be 0 (all cores) or a positive number of processes")
+    if args.save_vocabulary and (args.ngrams or args.cooccurrence or args.approximate):
+        parser.error("--save-vocabulary needs exact single-word counts")
+    if args.ngrams and args.cooccurrence:
+        parser.error("--ngrams and --cooccurrence cannot be combined")
+    if (args.ngrams or args.cooccurrence) and (args.approximate or args.index):
+        parser.error("--ngrams/--cooccurrence cannot be combined with --approximate or --index")
+    if not 0 < args.error_bound < 1:
+        parser.error("--error-bound must be between 0 and 1 (exclusive)")
+    if args.approximate and not args.top:
+        parser.error("--approximate requires --top")
+    if args.index and args.approximate:
+        parser.error("--index keeps exact counts and cannot be combined with --approximate")
+    return args
+
+
+def count_ngram_rows(args):
+    """
+    Count the n-grams or co-occurring pairs of the input files.
+
+    Returns:
+        tuple: (rows, headers, report lines) for the results file.
+    """
+    counter = NGramCounter(n=args.ngrams or 2, window=args.cooccurrence,
+                           max_entries=args.max_entries)
+    for input_file in args.input_files:
+        counter.update(iter_words(input_file))
+    items = counter.top(args.top) if args.top else counter.items()
+    rows = [(' '.join(words), count) for words, count in items]
+    lines = [f"{words}: {count}" for words, count in rows]
+    if counter.pruned_below:
+        lines.append(f"Pruned keys counted fewer than {counter.pruned_below} times")
+    return rows, ('words', 'count'), lines
+
+
+def count_approximate_rows(args):
+    """
+    Estimate the top words of the input files with a Space-Saving summary.
+
+    Returns:
+        tuple: (rows, headers, report lines) for the results file.
+    """
+    summary = SpaceSaving.from_error_bound(args.error_bound, args.max_counters)
+    for input_file in args.input_files:
+        summary.update(iter_words(input_file))
+    rows = summary.top(args.top)
+    lines = [f"{word}: {count} (overcount <= {error})" for word, count, error in rows]
+    lines.append(f"Maximum overcount: {summary.max_error()} of {summary.total} words")
+    return rows, RESULT_HEADERS + ('overcount',), lines
+
+
+def count_indexed(args):
+    """
+    Update the WordCountIndex of --index with the input files and return its counts.
+
+    Missing files and rewritten inputs are reported and exit with status 1.
+    """
+    if args.rebuild and os.path.exists(args.index):
+        os.remove(args.index)
+    word_index = WordCountIndex(args.index)
+    try:
+        for input_file in args.input_files:
+            if not os.path.isfile(input_file):
+                print(f"Error: The file '{input_file}' was not found.")
+                sys.exit(1)
+            word_index.update_file(input_file)
+        return word_index.counts()
+    except ValueError as error:
+        print(f"Error: {error}")
         sys.exit(1)
+    finally:
+        word_index.close()
+
+
+def count_exact_rows(args):
+    """
+    Count every word of the input files exactly.
+
+    Returns:
+        tuple: (rows, headers, report lines) for the results file.
+    """
+    if args.index:
+        word_count = count_indexed(args)
+    elif args.save_vocabulary and args.workers == 1:
+        # Counted straight into the vocabulary that is saved, without an intermediate dict
+        word_count = VocabularyCounts()
+        for input_file in args.input_files:
+            word_count.update(iter_words(input_file))
+    elif args.workers == 1 and len(args.input_files) == 1:
+        word_count = count_word_frequencies(iter_words(args.input_files[0]))
+    else:
+        word_count = count_words_parallel(args.input_files, args.workers or None)
+    if args.save_vocabulary:
+        if not isinstance(word_count, VocabularyCounts):
+            # The index and the parallel reduction already hold their counts in a dict
+            word_count = VocabularyCounts.from_counts(word_count)
+        word_count.save(args.save_vocabulary)
+    rows = top_k_exact(word_count, args.top) if args.top else list(word_count.items())
+    return rows, RESULT_HEADERS, [f"{word}: {frequency}" for word, frequency in rows]
 
+
+def main(argv=None):
+    """
+    Count the words of the files given on the command line and save the results.
+
+    Args:
+        argv (list of str, optional): The command line arguments; defaults to sys.argv[1:].
+    """
+    args = parse_args(argv)
     start_time = time.time()  # Record the start time
 
-    input_file = sys.argv[1]
-    words = read_words_from_file(input_file)
+    phase_timer = PhaseTimer(args.phases, args.trace_memory)
+    # Words are read and counted in one streaming pass
+    with phase_timer.phase('read+compute'):
+        if args.ngrams or args.cooccurrence:
+            rows, headers, result_lines = count_ngram_rows(args)
+        elif args.approximate:
+            rows, headers, result_lines = count_approximate_rows(args)
+        else:
+            rows, headers, result_lines = count_exact_rows(args)
 
-    if not words:
+    if not rows:
         print("No valid words found in the file. Exiting.")
         sys.exit(1)
 
-    word_count = count_word_frequencies(words)
-
     end_time = time.time()  # Record the end time
     execution_time = end_time - start_time  # Calculate the execution time
 
-    print("Words and their frequencies:")
-    for word, frequency in word_count.items():
-        print(f"{word}: {frequency}")
+    with phase_timer.phase('write'):
+        if not args.quiet:
+            sys.stdout.write("Words and their frequencies:\n")
+            sys.stdout.writelines(f"{line}\n" for line in result_lines)
 
-    # Write the results to WordCountResults.txt, including execution time
-    with open("WordCountResults.txt", "w", encoding='utf-8') as result_file:
-        result_file.write("Words and their frequencies:\n")
-        for word, frequency in word_count.items():
-            result_file.write(f"{word}: {frequency}\n")
-        result_file.write(f"Execution time: {execution_time:.2f} seconds\n")
+        # Write the results; the text report also records the execution time
+        results_file = "WordCountResults" + OUTPUT_EXTENSIONS[args.output]
+        if args.output == 'txt':
+            write_results(result_lines, execution_time, results_file)
+        else:
+            save_word_counts(rows, results_file, args.output, headers)
 
-    print("Results have been saved to WordCountResults.txt")
+    print(f"Results have been saved to {results_file}")
     print(f"Execution time: {execution_time:.2f} seconds")
+    phase_timer.report(results_file if args.output == 'txt' else None)
+    phase_timer.close()
+
+
+if __name__ == "__main__":
+    main()
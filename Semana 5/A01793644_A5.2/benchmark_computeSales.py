@@ -0,0 +1,146 @@
+"""
+This module benchmarks the lean and pandas aggregation engines of computeSales.
+"""
+import argparse
+import io
+import json
+import os
+import random
+import time
+from contextlib import redirect_stdout
+from tempfile import TemporaryDirectory
+
+from computeSales import read_product_list, read_sales, compute_total_cost, \
+    read_json_records, iter_json_records, build_price_index, compute_total_cost_lean, \
+    build_cents_index, compute_total_cents_lean, compute_total_cost_cents, cents_to_decimal
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CATALOG_PATH = os.path.join(BASE_DIR, 'TC1', 'TC1.ProductList.json')
+TEST_CASES = [os.path.join(BASE_DIR, f'TC{case}', f'TC{case}.Sales.json') for case in (1, 2, 3)]
+
+
+def write_synthetic_sales(file_path, rows, titles, seed=0):
+    """
+    Write 'rows' random sales of the given product titles as a JSON array, one per line.
+    """
+    rng = random.Random(seed)
+    with open(file_path, 'w', encoding='UTF-8') as file:
+        file.write('[\n')
+        for sale_id in range(rows):
+            record = {"SALE_ID": sale_id // 3 + 1,
+                      "SALE_Date": f"{rng.randint(1, 28):02d}/12/23",
+                      "Product": rng.choice(titles),
+                      "Quantity": rng.randint(1, 20)}
+            file.write(json.dumps(record) + (',\n' if sale_id + 1 < rows else '\n'))
+        file.write(']\n')
+
+
+def run_lean(catalog_path, sales_path):
+    """
+    Compute the total with the lean engine, streaming the sales file.
+    """
+    price_index = build_price_index(read_json_records(catalog_path))
+    return compute_total_cost_lean(price_index, iter_json_records(sales_path))
+
+
+def run_pandas(catalog_path, sales_path):
+    """
+    Compute the total with the pandas engine, reading both files.
+    """
+    return compute_total_cost(read_product_list(catalog_path), read_sales(sales_path))
+
+
+def run_lean_exact(catalog_path, sales_path):
+    """
+    Compute the exact total in cents with the lean engine, streaming the sales file.
+    """
+    cents_index = build_cents_index(read_json_records(catalog_path))
+    return cents_to_decimal(compute_total_cents_lean(cents_index, iter_json_records(sales_path)))
+
+
+def run_pandas_exact(catalog_path, sales_path):
+    """
+    Compute the exact total in cents with int64 pandas columns, reading both files.
+    """
+    return cents_to_decimal(compute_total_cost_cents(read_product_list(catalog_path),
+                                                     read_sales(sales_path)))
+
+
+def time_aggregation(sales_path, repetitions):
+    """
+    Print the best times of the four aggregations on records already in memory.
+    """
+    catalog, sales = read_product_list(CATALOG_PATH), read_sales(sales_path)
+    price_index = build_price_index(read_json_records(CATALOG_PATH))
+    cents_index = build_cents_index(read_json_records(CATALOG_PATH))
+    records = read_json_records(sales_path)
+    timings = []
+    for label, aggregate in (
+            ("pandas float", lambda: compute_total_cost(catalog, sales)),
+            ("pandas cents", lambda: compute_total_cost_cents(catalog, sales)),
+            ("lean float", lambda: compute_total_cost_lean(price_index, records)),
+            ("lean cents", lambda: compute_total_cents_lean(cents_index, records))):
+        best = float('inf')
+        # The unmatched sales report of TC3 would be printed on every repetition
+        with redirect_stdout(io.StringIO()):
+            for _ in range(repetitions):
+                start = time.perf_counter()
+                aggregate()
+                best = min(best, time.perf_counter() - start)
+        timings.append(f"{label} {best:.4f}s")
+    print("  aggregation only: " + ", ".join(timings))
+
+
+def time_engine(engine, sales_path, repetitions):
+    """
+    Return the best wall time, in seconds, and the total of one engine.
+    """
+    best = float('inf')
+    with redirect_stdout(io.StringIO()):
+        for _ in range(repetitions):
+            start = time.perf_counter()
+            total = engine(CATALOG_PATH, sales_path)
+            best = min(best, time.perf_counter() - start)
+    return best, total
+
+
+def run_benchmark(sales_path, label, repetitions):
+    """
+    Print the pandas and lean times of a sales file and the speedup.
+    """
+    pandas_time, pandas_total = time_engine(run_pandas, sales_path, repetitions)
+    lean_time, lean_total = time_engine(run_lean, sales_path, repetitions)
+    exact_time, exact_total = time_engine(run_lean_exact, sales_path, repetitions)
+    pandas_exact_time, _ = time_engine(run_pandas_exact, sales_path, repetitions)
+    print(f"{label}: pandas {pandas_time:.4f}s, lean {lean_time:.4f}s, "
+          f"speedup {pandas_time / lean_time:.1f}x, "
+          f"totals {pandas_total:.2f} / {lean_total:.2f}")
+    print(f"  exact: lean {exact_time:.4f}s, pandas {pandas_exact_time:.4f}s, "
+          f"total {exact_total}")
+    time_aggregation(sales_path, repetitions)
+
+
+def main():
+    """
+    Benchmark the test cases and a synthetic sales file of --rows sales.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark computeSales engines.")
+    parser.add_argument('--rows', type=int, default=10_000_000,
+                        help="number of synthetic sales (default 10000000)")
+    parser.add_argument('--repetitions', type=int, default=3)
+    args = parser.parse_args()
+
+    # Warm up the pandas import so it is not charged to the first test case
+    with redirect_stdout(io.StringIO()):
+        run_pandas(CATALOG_PATH, TEST_CASES[0])
+    for sales_path in TEST_CASES:
+        run_benchmark(sales_path, os.path.basename(sales_path), max(args.repetitions, 10))
+    with TemporaryDirectory() as temp_dir:
+        synthetic_path = os.path.join(temp_dir, 'sales.json')
+        titles = list(build_price_index(read_json_records(CATALOG_PATH)))
+        write_synthetic_sales(synthetic_path, args.rows, titles)
+        run_benchmark(synthetic_path, f"synthetic {args.rows} rows", args.repetitions)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,523 @@
+import io
+import json
+from decimal import Decimal
+import os
+import shutil
+import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+import pandas as pd
+
+import computeSales
+from computeSales import read_product_list, read_sales, compute_total_cost, \
+    read_json_records, iter_json_records, build_price_index, compute_total_cost_lean, \
+    SalesSummary, summarize_sales_files, load_price_index, catalog_cache_path, \
+    ValidationSummary, validate_columns, SALE_TYPES, SalesCheckpoint, to_cents, \
+    cents_to_decimal, build_cents_index, compute_total_cents_lean, compute_total_cost_cents, \
+    normalize_title, ProductMatcher
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CATALOG_PATH = os.path.join(BASE_DIR, 'TC1', 'TC1.ProductList.json')
+# Totals of the course test cases, from Results.txt
+EXPECTED_TOTALS = {1: 2481.86, 2: 166568.23, 3: 165235.37}
+
+
+def sales_path(case):
+    """Return the sales file of a course test case."""
+    return os.path.join(BASE_DIR, f'TC{case}', f'TC{case}.Sales.json')
+
+
+class TestLeanEngine(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def write_json(self, name, data):
+        """Write data to a JSON file in the temporary directory and return its path."""
+        file_path = os.path.join(self.temp_dir.name, name)
+        with open(file_path, 'w', encoding='UTF-8') as file:
+            json.dump(data, file)
+        return file_path
+
+    def test_matches_pandas_on_test_cases(self):
+        """The lean engine reproduces the pandas totals of TC1-TC3."""
+        price_index = build_price_index(read_json_records(CATALOG_PATH))
+        catalog = read_product_list(CATALOG_PATH)
+        for case, expected in EXPECTED_TOTALS.items():
+            lean_total = compute_total_cost_lean(price_index, read_json_records(sales_path(case)))
+            pandas_total = compute_total_cost(catalog, read_sales(sales_path(case)))
+            self.assertAlmostEqual(lean_total, expected, places=2)
+            self.assertAlmostEqual(lean_total, pandas_total, places=6)
+
+    def test_invalid_records_are_skipped_like_pandas(self):
+        """Wrong types, unknown products and duplicate titles give the pandas total."""
+        catalog_path = self.write_json('catalog.json', [
+            {"title": "Tea", "price": 2.5},
+            {"title": "Tea", "price": 1.0},
+            {"title": "Cake", "price": 4},
+            {"title": 7, "price": 3.0},
+            {"title": "Bread", "price": 1.25}])
+        sales_file = self.write_json('sales.json', [
+            {"SALE_ID": 1, "Product": "Tea", "Quantity": 2},
+            {"SALE_ID": 1, "Product": "Cake", "Quantity": 1},
+            {"SALE_ID": 2, "Product": "Bread", "Quantity": "3"},
+            {"SALE_ID": 2, "Product": "Bread", "Quantity": 4},
+            {"SALE_ID": 3, "Product": "Coffee", "Quantity": 9}])
+        with patch('sys.stdout', new_callable=io.StringIO) as output:
+            lean_total = compute_total_cost_lean(
+                build_price_index(read_json_records(catalog_path)),
+                read_json_records(sales_file))
+            pandas_total = compute_total_cost(read_product_list(catalog_path),
+                                              read_sales(sales_file))
+        self.assertAlmostEqual(lean_total, 12.0)
+        self.assertAlmostEqual(lean_total, pandas_total)
+        self.assertIn("'price': 1 values of type int, expected float (records 2)",
+                      output.getvalue())
+
+    def test_rejects_non_record_files(self):
+        """Files that are not a list of dictionaries give no records."""
+        file_path = self.write_json('bad.json', {"title": "Tea"})
+        with patch('sys.stdout', new_callable=io.StringIO) as output:
+            self.assertEqual(read_json_records(file_path), [])
+            self.assertEqual(read_json_records(os.path.join(self.temp_dir.name, 'none')), [])
+        self.assertIn("not a list of dictionaries", output.getvalue())
+
+
+class TestStreamingIngestion(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def write_text(self, name, text):
+        """Write text to a file in the temporary directory and return its path."""
+        file_path = os.path.join(self.temp_dir.name, name)
+        with open(file_path, 'w', encoding='UTF-8') as file:
+            file.write(text)
+        return file_path
+
+    def test_array_matches_json_load(self):
+        """Streaming the test cases gives json.load's records for any chunk size."""
+        for case in EXPECTED_TOTALS:
+            expected = read_json_records(sales_path(case))
+            for chunk_size in (1, 2, 7, 100, 1 << 16):
+                self.assertEqual(list(iter_json_records(sales_path(case), chunk_size)),
+                                 expected)
+
+    def test_json_lines_and_non_records(self):
+        """JSON lines are read too, and values that are not records are skipped."""
+        array_path = self.write_text('sales.json', ' [ {"a": "]"} , 12345, {"b": [1, 2]} ] ')
+        lines_path = self.write_text('sales.jsonl', '{"a": "]"}\n\n{"b": [1, 2]}\n')
+        with patch('sys.stdout', new_callable=io.StringIO) as output:
+            for chunk_size in (1, 3, 100):
+                self.assertEqual(list(iter_json_records(array_path, chunk_size)),
+                                 [{"a": "]"}, {"b": [1, 2]}])
+                self.assertEqual(list(iter_json_records(lines_path, chunk_size)),
+                                 [{"a": "]"}, {"b": [1, 2]}])
+        self.assertIn("Record 12345 is not a dictionary", output.getvalue())
+
+    def test_json_lines_keep_unicode_separators(self):
+        """Only '\\n' ends a JSON line, not the separators str.splitlines knows."""
+        title = "Line\u2028Paragraph\u2029Next\x85Group\x1cEnd"
+        lines_path = self.write_text('sales.jsonl', json.dumps({"Product": title},
+                                                                ensure_ascii=False) + '\n')
+        for chunk_size in (1, 5, 100):
+            self.assertEqual(list(iter_json_records(lines_path, chunk_size)),
+                             [{"Product": title}])
+
+    def test_malformed_arrays_raise(self):
+        """Truncated or badly separated arrays raise ValueError."""
+        for text in ('[{"a": 1}', '[{"a": 1} {"b": 2}]', '[{"a": ', '['):
+            file_path = self.write_text('bad.json', text)
+            with self.assertRaises(ValueError):
+                list(iter_json_records(file_path, 2))
+
+
+class TestSalesSummary(unittest.TestCase):
+    def setUp(self):
+        self.price_index = build_price_index(read_json_records(CATALOG_PATH))
+        self.catalog = read_product_list(CATALOG_PATH)
+
+    def test_breakdowns_add_up(self):
+        """Every breakdown of a single pass sums to the total cost."""
+        for case, expected in EXPECTED_TOTALS.items():
+            summary = SalesSummary().add_sales(self.price_index,
+                                               iter_json_records(sales_path(case)))
+            self.assertAlmostEqual(summary.total(), expected, places=2)
+            for breakdown in (summary.by_sale, summary.by_product, summary.by_day):
+                self.assertAlmostEqual(sum(breakdown.values()), expected, places=6)
+            revenues = [revenue for _, revenue in summary.top_products(3)]
+            self.assertEqual(revenues, sorted(summary.by_product.values(), reverse=True)[:3])
+
+    def test_matches_pandas_groupby(self):
+        """The single pass and the pandas groupbys give the same breakdowns and order."""
+        for case in EXPECTED_TOTALS:
+            lean = SalesSummary().add_sales(self.price_index,
+                                            iter_json_records(sales_path(case)))
+            vectorized = SalesSummary.from_dataframes(self.catalog, read_sales(sales_path(case)))
+            for name in ('by_sale', 'by_product', 'by_day', 'quantities'):
+                lean_breakdown = getattr(lean, name)
+                vectorized_breakdown = getattr(vectorized, name)
+                self.assertEqual(list(lean_breakdown), list(vectorized_breakdown))
+                for key, value in lean_breakdown.items():
+                    self.assertAlmostEqual(value, vectorized_breakdown[key], places=6)
+            self.assertEqual(lean.report_lines(), vectorized.report_lines())
+
+    def test_report_lines(self):
+        """The report lists the top products with their units, then each breakdown."""
+        summary = SalesSummary().add_sales({"Tea": 2.5, "Cake": 4.0}, [
+            {"SALE_ID": 1, "SALE_Date": "01/12/23", "Product": "Tea", "Quantity": 4},
+            {"SALE_ID": 2, "SALE_Date": "02/12/23", "Product": "Cake", "Quantity": 1},
+            {"SALE_ID": 2, "SALE_Date": "02/12/23", "Product": "Tea", "Quantity": 1}])
+        self.assertEqual(summary.report_lines(top=1), [
+            "Top products:", "  Tea: 12.50 (5 units)",
+            "Revenue by product:", "  Tea: 12.50", "  Cake: 4.00",
+            "Revenue by day:", "  01/12/23: 10.00", "  02/12/23: 6.50",
+            "Revenue by sale:", "  1: 10.00", "  2: 6.50"])
+
+
+class TestBatchMode(unittest.TestCase):
+    def setUp(self):
+        self.price_index = build_price_index(read_json_records(CATALOG_PATH))
+        self.paths = [sales_path(case) for case in EXPECTED_TOTALS]
+
+    def test_parallel_matches_sequential(self):
+        """A process pool gives the per-file totals and merged breakdowns of one process."""
+        totals, summary, _ = summarize_sales_files(self.price_index, self.paths, True,
+                                                   workers=2)
+        sequential_totals, sequential, _ = summarize_sales_files(self.price_index, self.paths,
+                                                                 True)
+        self.assertEqual(totals, sequential_totals)
+        for total, expected in zip(totals, EXPECTED_TOTALS.values()):
+            self.assertAlmostEqual(total, expected, places=2)
+        self.assertEqual(summary.by_product, sequential.by_product)
+        self.assertEqual(summary.quantities, sequential.quantities)
+        self.assertAlmostEqual(summary.total(), sum(EXPECTED_TOTALS.values()), places=2)
+
+    def test_totals_only(self):
+        """Without breakdowns only the totals are returned."""
+        totals, summary, _ = summarize_sales_files(self.price_index, self.paths[:1], workers=2)
+        self.assertIsNone(summary)
+        self.assertAlmostEqual(totals[0], EXPECTED_TOTALS[1], places=2)
+
+
+class TestCatalogCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.catalog_path = os.path.join(self.temp_dir.name, 'catalog.json')
+        self.cache_dir = os.path.join(self.temp_dir.name, 'cache')
+        shutil.copyfile(CATALOG_PATH, self.catalog_path)
+        self.expected = build_price_index(read_json_records(CATALOG_PATH))
+
+    def test_snapshot_skips_parsing(self):
+        """Once the snapshot exists, the catalog JSON is neither parsed nor validated."""
+        self.assertEqual(load_price_index(self.catalog_path, self.cache_dir), self.expected)
+        self.assertTrue(os.path.isfile(catalog_cache_path(self.catalog_path, self.cache_dir)))
+        self.assertEqual(sorted(os.listdir(self.temp_dir.name)), ['cache', 'catalog.json'])
+        with patch.object(computeSales, 'read_json_records') as read_mock:
+            self.assertEqual(load_price_index(self.catalog_path, self.cache_dir), self.expected)
+            os.utime(self.catalog_path, ns=(0, 0))
+            self.assertEqual(load_price_index(self.catalog_path, self.cache_dir), self.expected)
+        read_mock.assert_not_called()
+
+    def test_changed_or_corrupt_catalog_is_rebuilt(self):
+        """Editing the catalog or damaging the snapshot rebuilds the index."""
+        load_price_index(self.catalog_path, self.cache_dir)
+        with open(self.catalog_path, 'w', encoding='UTF-8') as file:
+            json.dump([{"title": "Tea", "price": 2.5}], file)
+        self.assertEqual(load_price_index(self.catalog_path, self.cache_dir), {"Tea": 2.5})
+        with open(catalog_cache_path(self.catalog_path, self.cache_dir), 'wb') as file:
+            file.write(b'garbage')
+        self.assertEqual(load_price_index(self.catalog_path, self.cache_dir), {"Tea": 2.5})
+
+    def test_catalogs_with_the_same_name_get_their_own_snapshot(self):
+        """The snapshot name depends on the catalog's folder, not only its file name."""
+        other_path = os.path.join(self.cache_dir, 'catalog.json')
+        self.assertNotEqual(catalog_cache_path(self.catalog_path, self.cache_dir),
+                            catalog_cache_path(other_path, self.cache_dir))
+
+
+class TestBatchValidation(unittest.TestCase):
+    def setUp(self):
+        self.records = [
+            {"SALE_ID": 1, "Product": "Tea", "Quantity": 2},
+            {"SALE_ID": None, "Product": "Tea", "Quantity": "2"},
+            {"Product": 5, "Quantity": True, "Extra": []},
+            {"SALE_ID": 4, "Product": "Cake", "Quantity": "x"}]
+
+    def test_columns_match_per_record_checks(self):
+        """Wrong types and missing fields become None; isinstance semantics are kept."""
+        errors = ValidationSummary("sales")
+        columns = validate_columns(self.records, SALE_TYPES, errors)
+        self.assertEqual(columns, {"SALE_ID": [1, None, None, 4],
+                                   "Product": ["Tea", "Tea", None, "Cake"],
+                                   "Quantity": [2, None, True, None]})
+        self.assertEqual(len(errors), 4)
+        self.assertEqual(errors.errors[("Quantity", "int", "str")], [2, [1, 3]])
+
+    def test_summary_samples_rows(self):
+        """The report groups errors by field and type and samples a few record indices."""
+        errors = ValidationSummary("big.json")
+        validate_columns([{"Quantity": "1"}] * 8, {"Quantity": int}, errors)
+        self.assertEqual(errors.report_lines(), [
+            "Validation errors in big.json: 8",
+            "  'Quantity': 8 values of type str, expected int (records 0, 1, 2, 3, 4, ...)"])
+        self.assertEqual(ValidationSummary().report_lines(), [])
+
+    def test_read_sales_prints_one_summary(self):
+        """read_sales reports a summary instead of one line per bad field."""
+        with TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'sales.json')
+            with open(file_path, 'w', encoding='UTF-8') as file:
+                json.dump(self.records * 100, file)
+            with patch('sys.stdout', new_callable=io.StringIO) as output:
+                sales = read_sales(file_path)
+        self.assertEqual(len(sales), 400)
+        self.assertEqual(int(sales['Quantity'].isna().sum()), 200)
+        self.assertEqual(len(output.getvalue().splitlines()), 4)
+
+    def test_invalid_json_names_the_file(self):
+        """A malformed catalog is reported as the catalog, not as the sales file."""
+        with TemporaryDirectory() as temp_dir:
+            catalog_path = os.path.join(temp_dir, 'catalog.json')
+            with open(catalog_path, 'w', encoding='UTF-8') as file:
+                file.write('[{"title": "Tea",')
+            for engine in computeSales.ENGINES:
+                with patch('sys.stdout', new_callable=io.StringIO) as output, \
+                        self.assertRaises(SystemExit):
+                    computeSales.main([catalog_path, sales_path(1), '--engine', engine])
+                self.assertTrue(output.getvalue().startswith(
+                    f"Error: {catalog_path} is not valid JSON: "), output.getvalue())
+
+
+class TestSalesCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.price_index = build_price_index(read_json_records(CATALOG_PATH))
+        self.sales = read_json_records(sales_path(2))
+        self.feed_path = os.path.join(self.temp_dir.name, 'feed.jsonl')
+        self.state = SalesCheckpoint(os.path.join(self.temp_dir.name, 'state.db'))
+        self.addCleanup(self.state.close)
+
+    def append(self, records, text=''):
+        """Append records as JSON lines, plus optional raw text, to the feed."""
+        with open(self.feed_path, 'a', encoding='UTF-8') as file:
+            file.write(''.join(json.dumps(record) + '\n' for record in records) + text)
+
+    def test_appended_sales_update_totals(self):
+        """Each update only reads the new complete lines and ends at the full total."""
+        self.append(self.sales[:10], text='{"SALE_ID": 4, "Pro')
+        self.assertEqual(self.state.update_file(self.price_index, self.feed_path), 10)
+        partial = compute_total_cost_lean(self.price_index, self.sales[:10])
+        self.assertAlmostEqual(self.state.total(), partial, places=6)
+        with open(self.feed_path, 'r+', encoding='UTF-8') as file:
+            file.truncate(len(file.read()) - len('{"SALE_ID": 4, "Pro'))
+        self.append(self.sales[10:])
+        self.assertEqual(self.state.update_file(self.price_index, self.feed_path),
+                         len(self.sales) - 10)
+        self.assertEqual(self.state.update_file(self.price_index, self.feed_path), 0)
+        self.assertAlmostEqual(self.state.total(), EXPECTED_TOTALS[2], places=6)
+
+    def test_price_change_reprices_only_that_product(self):
+        """A new catalog price recomputes that product's revenue from its quantity."""
+        self.append(self.sales)
+        self.state.update_file(self.price_index, self.feed_path)
+        prices = dict(self.price_index, **{"Fresh blueberries": 1.0})
+        self.assertEqual(self.state.reprice(prices), 1)
+        self.assertEqual(self.state.reprice(prices), 0)
+        expected = compute_total_cost_lean(prices, self.sales)
+        self.assertAlmostEqual(self.state.total(), expected, places=6)
+
+    def test_last_line_without_newline(self):
+        """A final line that decodes counts even without its newline, and only once."""
+        self.append(self.sales[:5])
+        with open(self.feed_path, 'a', encoding='UTF-8') as file:
+            file.write(json.dumps(self.sales[5]))
+        self.assertEqual(self.state.update_file(self.price_index, self.feed_path), 6)
+        self.append([], text='\n')
+        self.append(self.sales[6:])
+        self.assertEqual(self.state.update_file(self.price_index, self.feed_path),
+                         len(self.sales) - 6)
+        self.assertAlmostEqual(self.state.total(), EXPECTED_TOTALS[2], places=6)
+
+    def write_array(self, records):
+        """Write records as an indented JSON array, as in the course test cases."""
+        array_path = os.path.join(self.temp_dir.name, 'feed.json')
+        with open(array_path, 'w', encoding='UTF-8') as file:
+            json.dump(records, file, indent=2, ensure_ascii=False)
+        return array_path
+
+    def test_json_array_resumes_after_checkpoint(self):
+        """Records appended to an array are the only ones decoded by the next update."""
+        sales = [dict(sale, Product="Jalapeño " + sale["Product"]) if row % 7 == 0 else sale
+                 for row, sale in enumerate(self.sales)]
+        array_path = self.write_array(sales[:10])
+        self.assertEqual(self.state.update_file(self.price_index, array_path), 10)
+        self.write_array(sales)
+        with patch.object(computeSales, 'iter_json_array',
+                          wraps=computeSales.iter_json_array) as decoder:
+            self.assertEqual(self.state.update_file(self.price_index, array_path),
+                             len(sales) - 10)
+        # Decoding resumed at the first appended record
+        resumed = computeSales.iter_json_array(io.StringIO(), decoder.call_args.args[1], 1024)
+        self.assertEqual(next(resumed), sales[10])
+        self.assertEqual(self.state.update_file(self.price_index, array_path), 0)
+        self.assertAlmostEqual(self.state.total(),
+                               compute_total_cost_lean(self.price_index, sales), places=6)
+
+    def test_json_array_and_rewrites(self):
+        """Arrays continue their checkpoint; rewritten feeds are rejected."""
+        self.assertEqual(self.state.update_file(self.price_index, sales_path(1)), 46)
+        self.assertEqual(self.state.update_file(self.price_index, sales_path(1)), 0)
+        self.assertAlmostEqual(self.state.total(), EXPECTED_TOTALS[1], places=6)
+        array_path = self.write_array(self.sales[:10])
+        self.state.update_file(self.price_index, array_path)
+        self.write_array(self.sales[1:12])
+        with self.assertRaises(ValueError):
+            self.state.update_file(self.price_index, array_path)
+        self.append(self.sales[:5])
+        self.state.update_file(self.price_index, self.feed_path)
+        with open(self.feed_path, 'w', encoding='UTF-8') as file:
+            file.write(json.dumps(self.sales[6]) + '\n' + json.dumps(self.sales[7]) + '\n')
+        with self.assertRaises(ValueError):
+            self.state.update_file(self.price_index, self.feed_path)
+
+
+class TestExactMoney(unittest.TestCase):
+    def test_cents_conversion(self):
+        """Prices become exact integer cents and back to exact decimals."""
+        self.assertEqual(to_cents(28.1), 2810)
+        self.assertEqual(to_cents(0.29), 29)
+        self.assertEqual(to_cents(1.015), 102)
+        self.assertEqual(to_cents(0.125), 12)
+        self.assertEqual(to_cents(-2.675), -268)
+        self.assertEqual(cents_to_decimal(16523537), Decimal('165235.37'))
+        self.assertEqual(cents_to_decimal(-5), Decimal('-0.05'))
+        self.assertEqual(str(cents_to_decimal(4356513830)), '43565138.30')
+
+    def test_exact_totals_of_test_cases(self):
+        """Both exact engines give the totals of Results.txt without float drift."""
+        cents_index = build_cents_index(read_json_records(CATALOG_PATH))
+        catalog = read_product_list(CATALOG_PATH)
+        for case, expected in EXPECTED_TOTALS.items():
+            expected = Decimal(str(expected))
+            lean = compute_total_cents_lean(cents_index, iter_json_records(sales_path(case)))
+            vectorized = compute_total_cost_cents(catalog, read_sales(sales_path(case)))
+            self.assertEqual(cents_to_decimal(lean), expected)
+            self.assertEqual(cents_to_decimal(vectorized), expected)
+            self.assertIsInstance(vectorized, int)
+
+    def test_repeated_titles_round_per_row(self):
+        """Both exact engines round every catalog row before summing a repeated title."""
+        products = [{"title": "Tea", "price": 0.125}, {"title": "Tea", "price": 0.125}]
+        sales = [{"SALE_ID": 1, "SALE_Date": "01/12/23", "Product": "Tea", "Quantity": 3}]
+        self.assertEqual(build_cents_index(products), {"Tea": 24})
+        lean = compute_total_cents_lean(build_cents_index(products), sales)
+        vectorized = compute_total_cost_cents(pd.DataFrame(products), pd.DataFrame(sales))
+        self.assertEqual(lean, vectorized)
+        self.assertEqual(lean, 72)
+
+    def test_half_cent_prices_round_from_their_text(self):
+        """Both exact engines round 1.015 up to 102 cents, although 1.015 * 100 < 101.5."""
+        products = [{"title": "Tea", "price": 1.015}, {"title": "Cake", "price": 2.675}]
+        sales = [{"SALE_ID": 1, "SALE_Date": "01/12/23", "Product": "Tea", "Quantity": 1},
+                 {"SALE_ID": 1, "SALE_Date": "01/12/23", "Product": "Cake", "Quantity": 1}]
+        lean = compute_total_cents_lean(build_cents_index(products), sales)
+        vectorized = compute_total_cost_cents(pd.DataFrame(products), pd.DataFrame(sales))
+        self.assertEqual(lean, 102 + 268)
+        self.assertEqual(vectorized, lean)
+
+    def test_invalid_and_unmatched_sales(self):
+        """The quick pass still validates odd records and reports unmatched products."""
+        sales = [{"Product": "Gum", "Quantity": 2}, {"Product": "Gum", "Quantity": "2"},
+                 {"Product": "Gum", "Quantity": True}, {"Product": "Mint", "Quantity": 4},
+                 {"Product": "Mint", "Quantity": 1}, {"Quantity": 9}]
+        errors = ValidationSummary("sales")
+        self.assertEqual(compute_total_cents_lean({"Gum": 10}, sales, errors), 30)
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors.unmatched, {"Mint": [2, 5, [3]]})
+
+    def test_breakdowns_keep_the_cents_total(self):
+        """With breakdowns the exact total is still counted in integer cents."""
+        cents_index = build_cents_index(read_json_records(CATALOG_PATH))
+        total, summary, _ = computeSales.summarize_sales_file(
+            cents_index, sales_path(2), breakdowns=True, exact=True)
+        self.assertEqual(cents_to_decimal(total), Decimal('166568.23'))
+        self.assertEqual(sum(summary.by_product.values()), Decimal('166568.23'))
+
+    def test_many_small_amounts_stay_exact(self):
+        """A million ten-cent sales add up to exactly 100000.00."""
+        sales = [{"Product": "Gum", "Quantity": 1}] * 1000000
+        self.assertEqual(cents_to_decimal(compute_total_cents_lean({"Gum": 10}, sales)),
+                         Decimal('100000.00'))
+
+
+class TestProductMatching(unittest.TestCase):
+    def setUp(self):
+        self.price_index = build_price_index(read_json_records(CATALOG_PATH))
+
+    def test_normalize_title(self):
+        """Case, spacing and accents are folded out of titles."""
+        self.assertEqual(normalize_title("  Crème  BRÛLÉE "), "creme brulee")
+        self.assertEqual(normalize_title("Raw\tlegums"), "raw legums")
+
+    def test_near_misses_resolve_to_catalog_titles(self):
+        """Normalized keys and n-gram similarity find the intended titles."""
+        matcher = ProductMatcher(self.price_index, fuzzy=True)
+        self.assertEqual(matcher.find("raw  LEGUMS"), ("Raw legums", "normalized"))
+        self.assertEqual(matcher.find("Brown egg")[0], "Brown eggs")
+        self.assertEqual(matcher.find("Frijoles"), (None, None))
+        self.assertEqual(ProductMatcher(self.price_index).find("Brown egg"), (None, None))
+
+    def test_unmatched_sales_report(self):
+        """Matching keeps the course totals and reports the unknown products of TC3."""
+        sales = read_json_records(sales_path(3))
+        errors = ValidationSummary("TC3")
+        matcher = ProductMatcher(self.price_index, fuzzy=True)
+        self.assertAlmostEqual(compute_total_cost_lean(matcher, sales, errors),
+                               EXPECTED_TOTALS[3], places=6)
+        self.assertEqual(sorted(errors.unmatched), ["Elotes", "Frijoles"])
+        self.assertEqual(errors.report_lines()[0],
+                         "Unmatched sales in TC3: 2 records of 2 products")
+
+        sales = [{"SALE_ID": 1, "SALE_Date": "01/01/23", "Product": "brown  EGGS", "Quantity": 2}]
+        errors = ValidationSummary("sales")
+        self.assertAlmostEqual(compute_total_cost_lean(matcher, sales, errors),
+                               2 * self.price_index["Brown eggs"])
+        self.assertEqual(errors.matched, {("brown  EGGS", "Brown eggs", "normalized"): 1})
+
+    def test_unmatched_products_are_saved(self):
+        """main writes the unmatched products to SalesResults.txt, not only to the console."""
+        cwd = os.getcwd()
+        with TemporaryDirectory() as temp_dir:
+            os.chdir(temp_dir)
+            try:
+                with patch('sys.stdout', new_callable=io.StringIO):
+                    computeSales.main([CATALOG_PATH, sales_path(3), '--match', 'fuzzy'])
+                with open('SalesResults.txt', encoding='UTF-8') as file:
+                    results = file.read().splitlines()
+            finally:
+                os.chdir(cwd)
+        self.assertIn(f"Unmatched sales in {sales_path(3)}: 2 records of 2 products", results)
+
+
+class TestCommandLine(unittest.TestCase):
+    def test_invalid_options_are_rejected(self):
+        """Invalid option values and combinations exit through parser.error."""
+        for argv in (['catalog.json', 'sales.json', '--workers', '-1'],
+                     ['catalog.json', 'sales.json', '--engine', 'pandas', '--cache-catalog'],
+                     ['catalog.json', 'sales.json', '--exact', '--state', 'totals.db']):
+            with patch('sys.stderr'), self.assertRaises(SystemExit):
+                computeSales.parse_args(argv)
+
+    def test_valid_options(self):
+        """Zero workers means all cores and is accepted."""
+        args = computeSales.parse_args(['catalog.json', 'sales.json', '--workers', '0'])
+        self.assertEqual(args.workers, 0)
+        self.assertEqual(args.sales_file_paths, ['sales.json'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,416 @@
+"""
+This module benchmarks the original and optimized paths of the Semana 4 and 5 tools.
+
+computeStatistics, convertNumbers, wordCount and computeSales are run on synthetic
+inputs of several scales. Every path is split into phases (read, parse, compute, write)
+timed with time.perf_counter, after a warm-up run, over several repetitions. The
+results are printed and saved as a JSON report that can be diffed, or compared with
+--baseline, between releases.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from tempfile import TemporaryDirectory
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TOOL_DIRS = [os.path.join(BASE_DIR, 'Semana 4', 'A01793644_A4.2', folder)
+             for folder in ('4.2.P1', '4.2-1.P2', '4.2.P3')] + \
+    [os.path.join(BASE_DIR, 'Semana 5', 'A01793644_A5.2')]
+sys.path[:0] = TOOL_DIRS
+
+# pylint: disable=wrong-import-position
+import benchmark_computeSales
+import benchmark_wordCount
+import computeSales
+import computeStatistics
+import convertNumbers
+import number_parsing
+import wordCount
+
+# Version of the JSON report layout
+REPORT_VERSION = 1
+# Input sizes: numbers, sales records, or approximate words of the synthetic inputs
+SCALES = {'small': 10_000, 'medium': 100_000, 'large': 1_000_000}
+# Fraction of invalid lines in the synthetic numeric inputs
+INVALID_RATIO = 0.01
+# Slowdown, as a ratio to the baseline, flagged by --baseline
+REGRESSION_THRESHOLD = 1.10
+
+
+def write_synthetic_numbers(file_path, count, integers=False, seed=0):
+    """
+    Write 'count' random numbers, one per line, with INVALID_RATIO of invalid lines.
+    """
+    rng = random.Random(seed)
+    with open(file_path, 'w', encoding='utf-8') as file:
+        for _ in range(count):
+            if rng.random() < INVALID_RATIO:
+                file.write(rng.choice(('ABC', '', '12..5', 'n/a', '1e')) + '\n')
+            elif integers:
+                file.write(f"{rng.randint(-10 ** 6, 10 ** 6)}\n")
+            else:
+                file.write(f"{rng.uniform(-1000, 1000):.4f}\n")
+
+
+def read_lines(file_path):
+    """
+    Read every line of a text file.
+    """
+    with open(file_path, 'r', encoding='utf-8') as file:
+        return file.readlines()
+
+
+def parse_numbers_per_line(lines, number_type):
+    """
+    Parse lines with 'number_type' one by one, as the tools did before number_parsing.
+    """
+    numbers = []
+    for item in lines:
+        try:
+            numbers.append(number_type(item.strip()))
+        except ValueError:
+            pass
+    return numbers
+
+
+@contextlib.contextmanager
+def quiet():
+    """
+    Silence the console output of a tool while it is benchmarked.
+    """
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, \
+            contextlib.redirect_stdout(devnull):
+        yield
+
+
+@contextlib.contextmanager
+def without_numpy():
+    """
+    Force the scalar convertNumbers path by hiding NumPy from it.
+    """
+    numpy_module, convertNumbers.np = convertNumbers.np, None
+    try:
+        yield
+    finally:
+        convertNumbers.np = numpy_module
+
+
+def statistics_paths(data_dir, count):
+    """
+    Return the input file and the timed paths of computeStatistics.
+    """
+    input_path = os.path.join(data_dir, f'statistics_{count}.txt')
+    write_synthetic_numbers(input_path, count)
+    output_path = os.path.join(data_dir, 'StatisticsResults.txt')
+    return input_path, {
+        'phases': [
+            ('read', lambda _: read_lines(input_path)),
+            ('parse', lambda lines: parse_numbers_per_line(lines, float)),
+            ('compute', computeStatistics.compute_statistics),
+            ('write', lambda stats: computeStatistics.save_statistics(stats, output_path))],
+        'shared_parser': [
+            ('read', lambda _: read_lines(input_path)),
+            ('parse', lambda lines: number_parsing.parse_numbers(
+                lines, float, number_parsing.ParseErrors(float))),
+            ('compute', computeStatistics.compute_statistics),
+            ('write', lambda stats: computeStatistics.save_statistics(stats, output_path))],
+        'process_file': [
+            ('total', lambda _: computeStatistics.process_file(input_path))],
+    }
+
+
+def conversion_paths(data_dir, count):
+    """
+    Return the input file and the timed paths of convertNumbers.
+    """
+    input_path = os.path.join(data_dir, f'numbers_{count}.txt')
+    write_synthetic_numbers(input_path, count, integers=True)
+    output_path = os.path.join(data_dir, 'ConversionResults.txt')
+
+    def convert_scalar(numbers):
+        with without_numpy():
+            return convertNumbers.numbers_to_binary_and_hexa(numbers)
+
+    def stream(_):
+        return convertNumbers.stream_converted_numbers(input_path, output_path, time.time())
+
+    return input_path, {
+        'scalar': [
+            ('read', lambda _: read_lines(input_path)),
+            ('parse', lambda lines: parse_numbers_per_line(lines, int)),
+            ('compute', convert_scalar),
+            ('write', lambda converted: convertNumbers.save_converted_numbers(
+                converted, output_path, 0.0))],
+        'vectorized': [
+            ('read', lambda _: read_lines(input_path)),
+            ('parse', lambda lines: parse_numbers_per_line(lines, int)),
+            ('compute', convertNumbers.numbers_to_binary_and_hexa),
+            ('write', lambda converted: convertNumbers.save_converted_numbers(
+                converted, output_path, 0.0))],
+        'shared_parser': [
+            ('read', lambda _: read_lines(input_path)),
+            ('parse', lambda lines: number_parsing.parse_numbers(
+                lines, int, number_parsing.ParseErrors(int))),
+            ('compute', convertNumbers.numbers_to_binary_and_hexa),
+            ('write', lambda converted: convertNumbers.save_converted_numbers(
+                converted, output_path, 0.0))],
+        'streaming': [('total', stream)],
+    }
+
+
+def word_count_paths(data_dir, count):
+    """
+    Return the input file and the timed paths of wordCount.
+    """
+    input_path = os.path.join(data_dir, f'corpus_{count}.txt')
+    # The synthetic words average about seven bytes with their separator
+    benchmark_wordCount.write_synthetic_corpus(input_path, count * 7)
+    # The generator writes whole blocks of words, so cut the corpus down to the scale
+    os.truncate(input_path, min(count * 7, os.path.getsize(input_path)))
+    output_path = os.path.join(data_dir, 'WordCountResults.txt')
+
+    def write(word_count):
+        wordCount.write_results([f"{word}: {frequency}" for word, frequency in
+                                 word_count.items()], 0.0, output_path)
+
+    return input_path, {
+        'original': [
+            ('read', lambda _: wordCount.read_words_from_file(input_path)),
+            ('compute', lambda words: wordCount.count_word_frequencies(words, fast=False)),
+            ('write', write)],
+        'fast': [
+            ('read', lambda _: wordCount.read_words_from_file(input_path)),
+            ('compute', wordCount.count_word_frequencies),
+            ('write', write)],
+        'streaming': [
+            ('read+compute', lambda _: wordCount.count_word_frequencies(
+                wordCount.iter_words(input_path))),
+            ('write', write)],
+    }
+
+
+def sales_paths(data_dir, count):
+    """
+    Return the sales file and the timed paths of computeSales.
+    """
+    catalog_path = benchmark_computeSales.CATALOG_PATH
+    input_path = os.path.join(data_dir, f'sales_{count}.json')
+    titles = list(computeSales.build_price_index(computeSales.read_json_records(catalog_path)))
+    benchmark_computeSales.write_synthetic_sales(input_path, count, titles)
+    output_path = os.path.join(data_dir, 'SalesResults.txt')
+
+    def write(total):
+        computeSales.write_to_txt_file(total, 0.0, output_path)
+
+    def read_lean(_):
+        return (computeSales.build_price_index(computeSales.read_json_records(catalog_path)),
+                computeSales.read_json_records(input_path))
+
+    return input_path, {
+        'pandas': [
+            ('read', lambda _: (computeSales.read_product_list(catalog_path),
+                                computeSales.read_sales(input_path))),
+            ('compute', lambda frames: computeSales.compute_total_cost(*frames)),
+            ('write', write)],
+        'lean': [
+            ('read', read_lean),
+            ('compute', lambda records: computeSales.compute_total_cost_lean(*records)),
+            ('write', write)],
+        'lean_exact': [
+            ('read', lambda _: (
+                computeSales.build_cents_index(computeSales.read_json_records(catalog_path)),
+                computeSales.read_json_records(input_path))),
+            ('compute', lambda records: computeSales.cents_to_decimal(
+                computeSales.compute_total_cents_lean(*records))),
+            ('write', write)],
+        'streaming': [
+            ('read+compute', lambda _: computeSales.compute_total_cost_lean(
+                computeSales.load_price_index(catalog_path),
+                computeSales.iter_json_records(input_path))),
+            ('write', write)],
+    }
+
+
+# Benchmarked tools and the functions building their inputs and timed paths
+TOOLS = {
+    'computeStatistics': statistics_paths,
+    'convertNumbers': conversion_paths,
+    'wordCount': word_count_paths,
+    'computeSales': sales_paths,
+}
+
+
+def time_phases(phases, repetitions, warmup=1):
+    """
+    Run a path of phases repeatedly and time every phase with time.perf_counter.
+
+    Each phase receives the value returned by the previous one (None for the first).
+    The first 'warmup' runs are not recorded.
+
+    Args:
+        phases (list of tuple): (phase name, function) pairs, in order.
+        repetitions (int): Recorded runs.
+        warmup (int): Unrecorded runs before the recorded ones.
+
+    Returns:
+        dict: Per phase, and for the whole path under 'total', the 'best', 'median' and
+        'mean' seconds and the raw 'samples'.
+    """
+    samples = {name: [] for name, _ in phases}
+    totals = []
+    with quiet():
+        for run in range(warmup + repetitions):
+            value, run_total = None, 0.0
+            for name, phase in phases:
+                start = time.perf_counter()
+                value = phase(value)
+                elapsed = time.perf_counter() - start
+                run_total += elapsed
+                if run >= warmup:
+                    samples[name].append(elapsed)
+            if run >= warmup:
+                totals.append(run_total)
+    if 'total' not in samples:
+        samples['total'] = totals
+    return {name: {'best': min(times), 'median': statistics.median(times),
+                   'mean': statistics.fmean(times), 'samples': times}
+            for name, times in samples.items()}
+
+
+def environment():
+    """
+    Describe the interpreter, libraries and revision the benchmark ran with.
+    """
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    numpy_module = convertNumbers.np
+    try:
+        import pandas  # pylint: disable=import-outside-toplevel
+        pandas_version = pandas.__version__
+    except ImportError:
+        pandas_version = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': numpy_module.__version__ if numpy_module is not None else None,
+        'pandas': pandas_version,
+        'revision': revision,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+
+
+def run_suite(tools, scales, repetitions, warmup=1):
+    """
+    Benchmark every path of the selected tools at the selected scales.
+
+    Returns:
+        dict: The report, with the 'environment' and one entry per tool, scale and path
+        under 'results'.
+    """
+    results = []
+    with TemporaryDirectory() as data_dir:
+        previous_dir = os.getcwd()
+        # process_file writes its results file into the working directory
+        os.chdir(data_dir)
+        try:
+            for tool in tools:
+                for scale in scales:
+                    input_path, paths = TOOLS[tool](data_dir, SCALES[scale])
+                    for path, phases in paths.items():
+                        timings = time_phases(phases, repetitions, warmup)
+                        results.append({'tool': tool, 'scale': scale, 'size': SCALES[scale],
+                                        'input_bytes': os.path.getsize(input_path),
+                                        'path': path, 'phases': timings})
+                        print(format_result(results[-1]), flush=True)
+        finally:
+            os.chdir(previous_dir)
+    return {'version': REPORT_VERSION, 'repetitions': repetitions, 'warmup': warmup,
+            'environment': environment(), 'results': results}
+
+
+def result_key(result):
+    """
+    Return the (tool, scale, path) that identifies a result across reports.
+    """
+    return result['tool'], result['scale'], result['path']
+
+
+def format_result(result):
+    """
+    Format one result as a console line with the best time of every phase.
+
+    Example:
+        computeSales medium lean: total 0.2114s (read 0.1800s, compute 0.0310s, ...)
+    """
+    phases = ', '.join(f"{name} {timing['best']:.4f}s"
+                       for name, timing in result['phases'].items() if name != 'total')
+    line = f"{' '.join(map(str, result_key(result)))}: " \
+        f"total {result['phases']['total']['best']:.4f}s"
+    return f"{line} ({phases})" if phases else line
+
+
+def compare_reports(report, baseline):
+    """
+    Compare the best total times of a report with a baseline report.
+
+    Returns:
+        list of str: One line per result present in both reports, marking slowdowns
+        beyond REGRESSION_THRESHOLD.
+    """
+    previous = {result_key(result): result for result in baseline['results']}
+    lines = []
+    for result in report['results']:
+        old = previous.get(result_key(result))
+        if old is None:
+            continue
+        ratio = result['phases']['total']['best'] / old['phases']['total']['best']
+        flag = '  REGRESSION' if ratio > REGRESSION_THRESHOLD else ''
+        lines.append(f"{' '.join(map(str, result_key(result)))}: {ratio:.2f}x of baseline"
+                     f"{flag}")
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Semana 4 and 5 tools.")
+    parser.add_argument('--tools', default=','.join(TOOLS),
+                        help="comma separated tools to benchmark (default: all)")
+    parser.add_argument('--scales', default='small,medium',
+                        help="comma separated scales: " + ', '.join(
+                            f"{name} ({size})" for name, size in SCALES.items()) +
+                        " (default small,medium)")
+    parser.add_argument('--repetitions', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--report', default='benchmark_report.json',
+                        help="JSON report to write (default benchmark_report.json)")
+    parser.add_argument('--baseline', metavar='REPORT',
+                        help="JSON report of a previous run to compare the totals with")
+    args = parser.parse_args()
+    selected_tools = [name for name in args.tools.split(',') if name]
+    selected_scales = [name for name in args.scales.split(',') if name]
+    unknown = [name for name in selected_tools if name not in TOOLS] + \
+        [name for name in selected_scales if name not in SCALES]
+    if unknown:
+        parser.error(f"unknown tools or scales: {', '.join(unknown)}")
+    if args.repetitions < 1:
+        parser.error("--repetitions must be at least 1")
+
+    suite_report = run_suite(selected_tools, selected_scales, args.repetitions, args.warmup)
+    with open(args.report, 'w', encoding='utf-8') as report_file:
+        json.dump(suite_report, report_file, indent=2, sort_keys=True)
+        report_file.write('\n')
+    print(f"Report saved to {args.report}")
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as baseline_file:
+            print('\n'.join(compare_reports(suite_report, json.load(baseline_file))))
@@ -0,0 +1,115 @@
+"""
+This module times the phases of the Semana 4 and 5 tools and tracks their peak memory.
+
+The tools import it from the repository root, take its command line options through
+add_phase_arguments and wrap their read, parse, compute and write steps in
+PhaseTimer.phase, so a run can report where its time went instead of a single elapsed
+value.
+"""
+import contextlib
+import os
+import time
+import tracemalloc
+
+# Bytes per unit of the peak memory in the phase report
+MEBIBYTE = 1 << 20
+
+
+def add_phase_arguments(parser, phases="read, parse, compute and write"):
+    """
+    Add the --phases and --trace-memory options of a tool to an argparse parser.
+
+    Example:
+        add_phase_arguments(parser, "read, compute and write")
+        timer = PhaseTimer(args.phases, args.trace_memory)
+    """
+    parser.add_argument('--phases', action='store_true',
+                        help=f"report the time of the {phases} phases")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="also report the peak memory of every phase (slower)")
+
+
+class PhaseTimer:
+    """
+    Accumulate the wall time, and optionally the tracemalloc peak, of named phases.
+
+    A phase entered several times (e.g. once per chunk of a streamed file) adds up its
+    times and keeps its highest peak, the most memory traced by tracemalloc at any moment
+    of the phase. Phases are reported in the order they first ran.
+    A disabled timer does nothing, so the tools can always wrap their phases.
+
+    Example:
+        timer = PhaseTimer(trace_memory=True)
+        with timer.phase('read'):
+            lines = file.readlines()
+        timer.report('StatisticsResults.txt') prints and appends:
+        Phase times:
+          read: 0.0012 s (peak memory 1.3 MiB)
+          total: 0.0012 s
+    """
+    def __init__(self, enabled=True, trace_memory=False):
+        self.enabled = enabled or trace_memory
+        self.trace_memory = trace_memory
+        self.phases = {}
+        self.started_tracing = False
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """
+        Time the body of a 'with' block as the phase 'name'; phases must not be nested.
+        """
+        if not self.enabled:
+            yield
+            return
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.started_tracing = True
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] if self.trace_memory else 0
+            entry = self.phases.setdefault(name, [0.0, 0])
+            entry[0] += elapsed
+            entry[1] = max(entry[1], peak)
+
+    def report_lines(self):
+        """
+        Format one line per phase and their total; no lines if the timer is disabled.
+        """
+        if not self.enabled or not self.phases:
+            return []
+        lines = ["Phase times:"]
+        for name, (seconds, peak) in self.phases.items():
+            memory = f" (peak memory {peak / MEBIBYTE:.1f} MiB)" if self.trace_memory else ""
+            lines.append(f"  {name}: {seconds:.4f} s{memory}")
+        lines.append(f"  total: {sum(seconds for seconds, _ in self.phases.values()):.4f} s")
+        return lines
+
+    def report(self, file_name=None):
+        """
+        Print the phase report and append it to the text results file 'file_name'.
+        """
+        lines = self.report_lines()
+        if not lines:
+            return
+        print('\n'.join(lines))
+        if file_name is not None:
+            with open(file_name, 'ab+') as file:
+                # Start on a new line even if the results file does not end with one
+                separator = b''
+                if file.seek(0, os.SEEK_END):
+                    file.seek(-1, os.SEEK_END)
+                    separator = b'' if file.read(1) == b'\n' else b'\n'
+                file.write(separator + ('\n'.join(lines) + '\n').encode('utf-8'))
+
+    def close(self):
+        """
+        Stop tracemalloc if this timer started it.
+        """
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
@@ -0,0 +1,185 @@
+"""
+This module parses text files with one number per line for computeStatistics and
+convertNumbers.
+
+Valid lines are converted by 'map' inside 'list.extend', so the loop runs in C and only
+an invalid line costs a Python-level step. Invalid lines are counted in a ParseErrors
+summary, which is printed once instead of a message per line; only the few quoted as
+examples are classified, so a file full of invalid lines is not parsed twice.
+"""
+from itertools import chain, islice
+
+# Invalid lines quoted as examples in a parse error report
+ERROR_EXAMPLES = 5
+# Lines parsed per chunk by iter_numbers
+PARSE_CHUNK_SIZE = 1 << 14
+
+
+def classify_invalid(text, number_type=float):
+    """
+    Name the reason why a line is not a valid 'number_type'.
+
+    Example:
+        classify_invalid('12.5\\n', int) returns 'not an integer'.
+    """
+    if not text.strip():
+        return "blank"
+    if number_type is not float:
+        try:
+            float(text)
+            return "not an integer"
+        except ValueError:
+            pass
+    return "not a number"
+
+
+class ParseErrors:
+    """
+    Invalid lines found while parsing, counted.
+
+    Only the first ERROR_EXAMPLES lines are kept and classified, as (line number, text,
+    reason), so a file with many invalid lines is summarized in a few lines and the
+    other invalid lines cost a single failed conversion each.
+    """
+    def __init__(self, number_type=float):
+        self.number_type = number_type
+        self.count = 0
+        self.examples = []
+
+    def __len__(self):
+        return self.count
+
+    def add(self, line_number, text):
+        """
+        Record that line 'line_number', holding 'text', is not a valid number.
+        """
+        self.count += 1
+        if len(self.examples) < ERROR_EXAMPLES:
+            self.examples.append(
+                (line_number, text.strip(), classify_invalid(text, self.number_type)))
+
+    def examples_needed(self):
+        """
+        Return how many more invalid lines are quoted as examples.
+        """
+        return ERROR_EXAMPLES - len(self.examples)
+
+    def report_lines(self):
+        """
+        Format the summary; no lines if every line was valid.
+
+        Example:
+            Invalid data on 3 lines, skipped:
+              line 4: 'ABC' is not a number
+              line 9: '' is blank
+              ...
+        """
+        if not self.count:
+            return []
+        lines = [f"Invalid data on {self.count} lines, skipped:"]
+        lines.extend(f"  line {line_number}: '{text}' is {reason}"
+                     for line_number, text, reason in self.examples)
+        if len(self) > len(self.examples):
+            lines.append(f"  ... and {len(self) - len(self.examples)} more")
+        return lines
+
+    def print_report(self):
+        """
+        Print the summary, if there were invalid lines.
+        """
+        for line in self.report_lines():
+            print(line)
+
+
+def parse_numbers(lines, number_type=float, errors=None, first_line=1):
+    """
+    Parse a list of lines into numbers, skipping and recording the invalid ones.
+
+    Surrounding whitespace is accepted, as by float() and int() themselves.
+
+    Args:
+        lines (list of str): The lines to parse.
+        number_type (type): float or int.
+        errors (ParseErrors, optional): Where the invalid lines are recorded.
+        first_line (int): The line number of lines[0] in the file.
+
+    Returns:
+        list: The valid numbers, in order.
+
+    Example:
+        parse_numbers(['1\\n', 'x\\n', '3\\n'], int) returns [1, 3] and records line 2.
+    """
+    numbers = []
+    remaining = iter(lines)
+    skipped = 0
+    wanted = examples = errors.examples_needed() if errors is not None else 0
+    while True:
+        try:
+            # extend keeps the numbers appended before a conversion fails
+            numbers.extend(map(number_type, remaining))
+            break
+        except ValueError:
+            skipped += 1
+            if examples:
+                examples -= 1
+                index = len(numbers) + skipped - 1
+                errors.add(first_line + index, lines[index])
+    if errors is not None:
+        # errors.add counted the quoted lines; the others are only counted here
+        errors.count += skipped - (wanted - examples)
+    return numbers
+
+
+def iter_number_chunks(lines, number_type=float, errors=None, chunk_size=PARSE_CHUNK_SIZE):
+    """
+    Lazily parse an iterable of lines, such as an open file, chunk by chunk.
+
+    Args:
+        lines (iterable of str): The lines to parse.
+        number_type (type): float or int.
+        errors (ParseErrors, optional): Where the invalid lines are recorded.
+        chunk_size (int): How many lines are parsed at a time.
+
+    Yields:
+        list: The valid numbers of each chunk, in order.
+    """
+    lines = iter(lines)
+    first_line = 1
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield parse_numbers(chunk, number_type, errors, first_line)
+        first_line += len(chunk)
+
+
+def iter_numbers(lines, number_type=float, errors=None, chunk_size=PARSE_CHUNK_SIZE):
+    """
+    Lazily parse an iterable of lines, yielding the valid numbers one by one.
+
+    Takes the same arguments as iter_number_chunks.
+    """
+    for numbers in iter_number_chunks(lines, number_type, errors, chunk_size):
+        yield from numbers
+
+
+def read_numbers(lines, number_type=float, errors=None, chunk_size=PARSE_CHUNK_SIZE,
+                 timer=None):
+    """
+    Parse an iterable of lines, such as an open file, into a list of the valid numbers.
+
+    The lines are read chunk by chunk, so a file is never held as a list of lines. With
+    an enabled PhaseTimer 'timer', all the lines are read first, so reading and parsing
+    are timed as the separate 'read' and 'parse' phases.
+
+    Example:
+        with open('data.txt', encoding='utf-8') as file:
+            numbers = read_numbers(file, float, errors)
+    """
+    if timer is not None and timer.enabled:
+        with timer.phase('read'):
+            lines = list(lines)
+        with timer.phase('parse'):
+            return parse_numbers(lines, number_type, errors)
+    return list(chain.from_iterable(
+        iter_number_chunks(lines, number_type, errors, chunk_size)))
@@ -0,0 +1,75 @@
+import argparse
+import io
+import os
+import tracemalloc
+import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from instrumentation import PhaseTimer, MEBIBYTE, add_phase_arguments
+
+
+class TestPhaseTimer(unittest.TestCase):
+    def test_repeated_phases_add_up(self):
+        """A phase entered once per chunk is reported once, in order of first use."""
+        timer = PhaseTimer()
+        for _ in range(3):
+            with timer.phase('parse'):
+                pass
+            with timer.phase('write'):
+                pass
+        self.assertEqual(list(timer.phases), ['parse', 'write'])
+        lines = timer.report_lines()
+        self.assertEqual(lines[0], "Phase times:")
+        self.assertTrue(lines[1].startswith("  parse: "))
+        self.assertTrue(lines[-1].startswith("  total: "))
+
+    def test_disabled_timer_reports_nothing(self):
+        """A disabled timer records no phases and prints nothing."""
+        timer = PhaseTimer(enabled=False)
+        with timer.phase('read'):
+            pass
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            timer.report()
+        self.assertEqual(timer.phases, {})
+        self.assertEqual(stdout.getvalue(), "")
+
+    def test_peak_memory_of_a_phase(self):
+        """With trace_memory the peak covers memory freed before the phase ended."""
+        timer = PhaseTimer(enabled=False, trace_memory=True)
+        with timer.phase('compute'):
+            buffer = bytearray(4 * MEBIBYTE)
+            del buffer
+        timer.close()
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertGreaterEqual(timer.phases['compute'][1], 4 * MEBIBYTE)
+        self.assertIn("(peak memory", timer.report_lines()[1])
+
+    def test_report_is_appended_to_results_file(self):
+        """The report starts on a new line of the results file."""
+        timer = PhaseTimer()
+        with timer.phase('read'):
+            pass
+        with TemporaryDirectory() as temp_dir:
+            file_name = os.path.join(temp_dir, 'SalesResults.txt')
+            with open(file_name, 'w', encoding='utf-8') as file:
+                file.write("total cost: 2481.86")
+            with patch('sys.stdout', new_callable=io.StringIO):
+                timer.report(file_name)
+            with open(file_name, 'r', encoding='utf-8') as file:
+                lines = file.read().splitlines()
+        self.assertEqual(lines[:2], ["total cost: 2481.86", "Phase times:"])
+
+    def test_phase_arguments(self):
+        """The shared options build a PhaseTimer; --trace-memory alone enables it."""
+        parser = argparse.ArgumentParser()
+        add_phase_arguments(parser)
+        args = parser.parse_args(['--trace-memory'])
+        timer = PhaseTimer(args.phases, args.trace_memory)
+        self.assertTrue(timer.enabled and timer.trace_memory)
+        args = parser.parse_args([])
+        self.assertFalse(PhaseTimer(args.phases, args.trace_memory).enabled)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import io
+import unittest
+from unittest.mock import patch
+
+from instrumentation import PhaseTimer
+import number_parsing
+from number_parsing import (ParseErrors, parse_numbers, iter_numbers, read_numbers,
+                            classify_invalid)
+
+
+class TestParseNumbers(unittest.TestCase):
+    def test_matches_per_line_parsing(self):
+        """The fast path keeps the numbers a per-line try/except loop would keep."""
+        lines = ['1.5\n', 'ABC\n', '\n', ' -2 \n', '1e3\n', '12..5\n', '7\n']
+        expected = []
+        for line in lines:
+            try:
+                expected.append(float(line.strip()))
+            except ValueError:
+                pass
+        errors = ParseErrors(float)
+        self.assertEqual(parse_numbers(lines, float, errors), expected)
+        self.assertEqual([line_number for line_number, _, _ in errors.examples], [2, 3, 6])
+
+    def test_invalid_lines_are_classified(self):
+        """Blank lines, decimals given to int and other text get their own reasons."""
+        self.assertEqual(classify_invalid(' \n', int), "blank")
+        self.assertEqual(classify_invalid('12.5\n', int), "not an integer")
+        self.assertEqual(classify_invalid('12.5.1\n', int), "not a number")
+        self.assertEqual(classify_invalid('ABC\n'), "not a number")
+
+    def test_report_is_aggregated(self):
+        """Many invalid lines are reported as counts and the first few examples."""
+        lines = ['x\n', '1\n'] * 20
+        errors = ParseErrors(int)
+        self.assertEqual(parse_numbers(lines, int, errors), [1] * 20)
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            errors.print_report()
+        report = stdout.getvalue().splitlines()
+        self.assertEqual(report[0], "Invalid data on 20 lines, skipped:")
+        self.assertEqual(report[1], "  line 1: 'x' is not a number")
+        self.assertEqual(len(report), number_parsing.ERROR_EXAMPLES + 2)
+        self.assertEqual(report[-1], f"  ... and {20 - number_parsing.ERROR_EXAMPLES} more")
+
+    def test_chunked_iteration_numbers_lines(self):
+        """Line numbers stay correct across the chunks of iter_numbers."""
+        lines = ['5\n'] * 7 + ['bad\n'] + ['6\n'] * 3
+        errors = ParseErrors(int)
+        self.assertEqual(list(iter_numbers(iter(lines), int, errors, chunk_size=3)),
+                         [5] * 7 + [6] * 3)
+        self.assertEqual(errors.examples, [(8, 'bad', "not a number")])
+
+    def test_only_examples_are_classified(self):
+        """Invalid lines past the examples are counted without being parsed again."""
+        lines = ['1.5\n'] * 50
+        errors = ParseErrors(int)
+        with patch.object(number_parsing, 'classify_invalid',
+                          wraps=number_parsing.classify_invalid) as classify:
+            self.assertEqual(parse_numbers(lines, int, errors), [])
+        self.assertEqual(len(errors), 50)
+        self.assertEqual(classify.call_count, number_parsing.ERROR_EXAMPLES)
+        self.assertEqual(errors.examples[0], (1, '1.5', "not an integer"))
+
+    def test_read_numbers_from_a_file(self):
+        """read_numbers parses an open file chunk by chunk into one list."""
+        file = io.StringIO('1\n2\nx\n' * 5)
+        errors = ParseErrors(int)
+        self.assertEqual(read_numbers(file, int, errors, chunk_size=4), [1, 2] * 5)
+        self.assertEqual([line_number for line_number, _, _ in errors.examples],
+                         [3, 6, 9, 12, 15])
+
+    def test_read_numbers_times_read_and_parse(self):
+        """With an enabled timer, reading and parsing are reported as separate phases."""
+        timer = PhaseTimer()
+        errors = ParseErrors(int)
+        self.assertEqual(read_numbers(io.StringIO('1\nx\n2\n'), int, errors, timer=timer),
+                         [1, 2])
+        self.assertEqual(list(timer.phases), ['read', 'parse'])
+        self.assertEqual(len(errors), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()